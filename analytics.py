@@ -0,0 +1,91 @@
+"""Department statistics computed from histogram rollups.
+
+The rollups, kept up to date by app.py on every write, hold per department the employee
+count and salary sum of each salary bucket, hire month and latest certification expiry
+month. Everything here is derived from those cells, a few hundred per department, so the
+cost does not grow with the number of employees. Salary percentiles are interpolated
+within a bucket and are accurate to the bucket width; tenure is accurate to the month.
+"""
+from datetime import date
+
+PERCENTILES = (10, 25, 50, 75, 90)
+COHORT_MONTHS = 24
+# cert_month bucket of employees without certifications
+NO_CERTIFICATION = 'none'
+
+def histogram_percentile(histogram, fraction):
+    """Value below which `fraction` of a histogram of sorted (lower, upper, count) buckets falls."""
+    total = sum(count for _, _, count in histogram)
+    if not total:
+        return None
+    target = fraction * total
+    seen = 0
+    for lower, upper, count in histogram:
+        if count and seen + count >= target:
+            return lower + (upper - lower) * (target - seen) / count
+        seen += count
+    return histogram[-1][1]
+
+def month_start(month):
+    year, month = month.split('-')
+    return date(int(year), int(month), 1)
+
+def recent_months(today, count):
+    """The `count` months up to and including today's, oldest first, as YYYY-MM strings."""
+    index = today.year * 12 + today.month - 1
+    return [f'{i // 12:04d}-{i % 12 + 1:02d}' for i in range(index - count + 1, index + 1)]
+
+def department_summary(cells, today, salary_bucket_width, cohort_months=COHORT_MONTHS):
+    """Summarize one department's cells, given as {dimension: {bucket: (headcount, salary_sum)}}."""
+    salaries = cells.get('salary_bucket', {})
+    headcount = sum(count for count, _ in salaries.values())
+    if not headcount:
+        return {'headcount': 0}
+
+    salary_histogram = sorted((int(bucket) * salary_bucket_width, (int(bucket) + 1) * salary_bucket_width, count)
+                              for bucket, (count, _) in salaries.items())
+    salary_total = sum(total for _, total in salaries.values())
+
+    # Employees are taken to be hired mid-month
+    hires = cells.get('hire_month', {})
+    tenure_histogram = sorted((years, years, count) for years, count in (
+        (max((today - month_start(month)).days - 15, 0) / 365.25, count) for month, (count, _) in hires.items()
+    ))
+
+    certifications = cells.get('cert_month', {})
+    this_month = today.strftime('%Y-%m')
+    # Month granularity: a certification expiring this month still counts as current
+    current = sum(count for month, (count, _) in certifications.items() if month != NO_CERTIFICATION and month >= this_month)
+
+    return {
+        'headcount': headcount,
+        'salary': {
+            'mean': round(salary_total / headcount, 2),
+            **{f'p{p}': round(histogram_percentile(salary_histogram, p / 100), 2) for p in PERCENTILES},
+        },
+        'tenure_years': {
+            'mean': round(sum(years * count for years, _, count in tenure_histogram) / headcount, 2),
+            'median': round(histogram_percentile(tenure_histogram, 0.5), 2),
+        },
+        'cohorts': [{'month': month, 'hires': hires.get(month, (0, 0))[0]} for month in recent_months(today, cohort_months)],
+        'certifications': {
+            'certified': headcount - certifications.get(NO_CERTIFICATION, (0, 0))[0],
+            'current': current,
+            'coverage': round(current / headcount, 4),
+        },
+    }
+
+def summarize(rows, today, salary_bucket_width, cohort_months=COHORT_MONTHS):
+    """Per-department and company-wide statistics from (department, dimension, bucket, headcount, salary_sum) rows."""
+    departments, company = {}, {}
+    for department, dimension, bucket, headcount, salary_sum in rows:
+        for cells in (departments.setdefault(department, {}), company):
+            count, total = cells.setdefault(dimension, {}).get(bucket, (0, 0.0))
+            cells[dimension][bucket] = (count + headcount, total + salary_sum)
+
+    return {
+        'as_of': today.isoformat(),
+        'departments': {name: department_summary(cells, today, salary_bucket_width, cohort_months)
+                        for name, cells in sorted(departments.items())},
+        'company': department_summary(company, today, salary_bucket_width, cohort_months),
+    }
@@ -1,11 +1,42 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, stream_template, stream_with_context, abort, get_template_attribute, send_file
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import event, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
+from datetime import datetime, date, timedelta, timezone
 from functools import wraps
+from collections import namedtuple
+from types import MappingProxyType
 from markupsafe import Markup
 import os
+import sys
+import importlib.util
+import click
+import threading
 import json
 import hashlib
+import time
+import base64
+import csv
+import io
+import zipfile
+import bisect
+import heapq
+import itertools
+import random
+
+try:
+    import orjson
+except ImportError:
+    # Optional; the JSON API falls back to the standard library encoder
+    orjson = None
+
+from migrate_db import run_migrations
+from metrics import init_metrics
+from fragment_cache import init_fragment_cache
+from scheduler import init_scheduler
+from jobs import init_jobs
+from analytics import summarize as summarize_rollups
 
 app = Flask(__name__)
 
@@ -18,7 +49,58 @@ app.config['SECRET_KEY'] = 'your-secret-key'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///employees.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db = SQLAlchemy(app)
+# Bound to the app in create_app(); importing this module does no database work
+db = SQLAlchemy()
+
+# SQLite engine profile, applied to every new connection; override with the SQLITE_PRAGMAS setting
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,      # wait up to 5 s for a lock instead of failing at once
+    'journal_mode': 'WAL',     # readers and the writer no longer block each other
+    'synchronous': 'NORMAL',   # with WAL, fsync at checkpoints instead of on every commit
+    'cache_size': -65536,      # 64 MiB page cache per connection
+    'mmap_size': 268435456,    # read up to 256 MiB of the file through the page cache
+    'temp_store': 'MEMORY',
+}
+SQLITE_ENGINE_OPTIONS = {'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 10}
+SQLITE_BUSY_RETRIES = 3
+
+def configure_sqlite_engine(engine, pragmas):
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+def create_app(config=None):
+    """Configure the application and bind its extensions, without touching the database.
+    
+    Settings can be overridden with FLASK_-prefixed environment variables (for example
+    FLASK_SQLALCHEMY_DATABASE_URI or FLASK_SQLITE_PRAGMAS='{"journal_mode": "DELETE"}')
+    or the `config` mapping. This module holds a single
+    application, so repeated calls return the same, already initialised app.
+    """
+    if 'sqlalchemy' not in app.extensions:
+        app.config.from_prefixed_env()
+        if config:
+            app.config.update(config)
+        uri = app.config['SQLALCHEMY_DATABASE_URI']
+        if uri.startswith('sqlite') and uri != 'sqlite://' and ':memory:' not in uri:
+            # In-memory databases use a single shared connection; only file databases get a pool
+            app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', dict(SQLITE_ENGINE_OPTIONS))
+        db.init_app(app)
+        with app.app_context():
+            configure_sqlite_engine(db.engine, app.config.get('SQLITE_PRAGMAS', SQLITE_PRAGMAS))
+        init_metrics(app)
+        init_fragment_cache(app)
+        init_jobs(app)
+        scheduler = init_scheduler(app)
+        scheduler.add_job(CERTIFICATION_SCAN_JOB, CERTIFICATION_SCAN_INTERVAL, run_scheduled_certification_scan)
+        scheduler.add_job(JOB_RECOVERY_JOB, JOB_RECOVERY_INTERVAL, run_scheduled_job_recovery)
+    return app
 
 # Login required decorator
 def login_required(f):
@@ -43,6 +125,27 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def is_busy_error(error):
+    orig = getattr(error, 'orig', None)
+    # SQLITE_BUSY / SQLITE_LOCKED, including extended codes such as SQLITE_BUSY_SNAPSHOT
+    return (getattr(orig, 'sqlite_errorcode', 0) & 0xff) in (5, 6) or 'database is locked' in str(orig)
+
+# Retry decorator for write views: re-runs the view when SQLite reports the database busy
+def retry_on_busy(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        retries = app.config.get('SQLITE_BUSY_RETRIES', SQLITE_BUSY_RETRIES)
+        for attempt in itertools.count():
+            try:
+                return f(*args, **kwargs)
+            except OperationalError as error:
+                if attempt >= retries or not is_busy_error(error):
+                    raise
+                db.session.rollback()
+                # Jittered exponential backoff so competing writers don't retry in lockstep
+                time.sleep(random.uniform(0.5, 1.0) * 0.05 * 2 ** attempt)
+    return decorated_function
+
 # User model for authentication
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -67,7 +170,7 @@ class User(db.Model):
 # Education model
 class Education(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False, index=True)
     institution = db.Column(db.String(100), nullable=False)
     degree = db.Column(db.String(100), nullable=False)
     field_of_study = db.Column(db.String(100), nullable=False)
@@ -82,15 +185,18 @@ class Education(db.Model):
 # Certification model
 class Certification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     issuing_organization = db.Column(db.String(100), nullable=False)
     issue_date = db.Column(db.Date, nullable=False)
-    expiry_date = db.Column(db.Date, nullable=True)
+    expiry_date = db.Column(db.Date, nullable=True, index=True)
     credential_id = db.Column(db.String(100), nullable=True)
     credential_url = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Covers the per-employee certification status lookups of the faceted search
+    __table_args__ = (db.Index('ix_certification_employee_expiry', 'employee_id', 'expiry_date'),)
+    
     def __repr__(self):
         return f'<Certification {self.name} from {self.issuing_organization}>'
 
@@ -99,37 +205,1802 @@ class Employee(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.String(50), unique=True, nullable=True)  # Added employee ID field
     first_name = db.Column(db.String(50), nullable=False)
-    last_name = db.Column(db.String(50), nullable=False)
+    last_name = db.Column(db.String(50), nullable=False, index=True)
     email = db.Column(db.String(100), unique=True, nullable=False)
     phone = db.Column(db.String(20), nullable=False)
-    department = db.Column(db.String(50), nullable=False)
-    position = db.Column(db.String(50), nullable=False)
-    hire_date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
+    # Old values are loaded on change so flush listeners can compute headcount/autocomplete deltas
+    department = db.column_property(db.Column(db.String(50), nullable=False, index=True), active_history=True)
+    department_id = db.Column(db.Integer, db.ForeignKey('department.id'), nullable=True)
+    position = db.column_property(db.Column(db.String(50), nullable=False, index=True), active_history=True)
+    hire_date = db.Column(db.Date, nullable=False, default=datetime.utcnow, index=True)
     current_address = db.Column(db.String(200), nullable=False)  # Renamed from address
     permanent_address = db.Column(db.String(200), nullable=True)  # Added permanent address
     salary = db.Column(db.Float, default=0)
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Row version, advanced on every write to the employee or its education/certification rows
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # BM25 score of the current full-text search; loaded only by search queries
+    rank = db.query_expression()
     
     # Relationships
     educations = db.relationship('Education', backref='employee', lazy=True, cascade="all, delete-orphan")
     certifications = db.relationship('Certification', backref='employee', lazy=True, cascade="all, delete-orphan")
     
+    __table_args__ = (
+        db.Index('ix_employee_department_updated_at', 'department', 'updated_at'),
+        # Covers the facet count query, so it never reads the table itself
+        db.Index('ix_employee_search_facets', 'department', 'position', 'hire_date', 'salary'),
+    )
+    
     def __repr__(self):
         return f'<Employee {self.first_name} {self.last_name}>'
 
-# Create database tables and default admin user
-with app.app_context():
+# Department catalog; headcount is a materialized count kept up to date on every flush
+class Department(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+    headcount = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationship with Employee
+    employees = db.relationship('Employee', backref='department_record', lazy='dynamic')
+    
+    def __repr__(self):
+        return f'<Department {self.name}>'
+
+# Append-only change log; one row per write to an employee or department, in the writer's transaction
+class ChangeLogEntry(db.Model):
+    __tablename__ = 'change_log'
+    # AUTOINCREMENT: sequence numbers are never reused, also after compaction deletes the newest rows
+    __table_args__ = (db.Index('ix_change_log_entity', 'entity', 'entity_id'), {'sqlite_autoincrement': True})
+    
+    seq = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # API resource name: employees or departments
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert, update or delete
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ChangeLogEntry {self.seq} {self.op} {self.entity}/{self.entity_id}>'
+
+# Analytics rollups: per-department histograms of salary, hire month and certification expiry,
+# kept up to date on every write (see refresh_employee_rollups)
+class DepartmentRollup(db.Model):
+    __tablename__ = 'department_rollup'
+    
+    department = db.Column(db.String(50), primary_key=True)
+    dimension = db.Column(db.String(20), primary_key=True)  # salary_bucket, hire_month or cert_month
+    bucket = db.Column(db.String(20), primary_key=True)
+    headcount = db.Column(db.Integer, nullable=False, default=0)
+    salary_sum = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<DepartmentRollup {self.department} {self.dimension}={self.bucket}>'
+
+# The cells each employee is counted in, so a write can take the old contribution back out
+class EmployeeRollupMember(db.Model):
+    __tablename__ = 'employee_rollup_member'
+    
+    employee_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    department = db.Column(db.String(50), nullable=False)
+    salary = db.Column(db.Float, nullable=False)
+    salary_bucket = db.Column(db.Integer, nullable=False)
+    hire_month = db.Column(db.String(7), nullable=False)
+    cert_month = db.Column(db.String(7), nullable=False)  # month of the latest expiry, 9999-12 if one never expires, none without certifications
+    
+    def __repr__(self):
+        return f'<EmployeeRollupMember {self.employee_id}>'
+
+# Bookkeeping of scheduled jobs: when each last ran, claimed by one process per interval, and its watermark
+class ScheduledJob(db.Model):
+    __tablename__ = 'scheduled_job'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+    state = db.Column(db.Text, nullable=True)  # JSON
+    
+    def __repr__(self):
+        return f'<ScheduledJob {self.name}>'
+
+# Outbox of certification expiry alerts, written by the expiry scan and marked delivered by its consumer
+class CertificationAlert(db.Model):
+    __tablename__ = 'certification_alert'
+    # One alert per certification and expiry date; renewing a certification makes it eligible again
+    __table_args__ = (db.UniqueConstraint('certification_id', 'expiry_date'),
+                      db.Index('ix_certification_alert_pending', 'delivered_at', 'id'))
+    
+    id = db.Column(db.Integer, primary_key=True)
+    certification_id = db.Column(db.Integer, nullable=False)
+    employee_id = db.Column(db.Integer, nullable=False)
+    expiry_date = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<CertificationAlert {self.certification_id} expires {self.expiry_date}>'
+
+# Long-running admin operations, run by the background job pool; progress and total are in units the job chooses
+class BackgroundJob(db.Model):
+    __tablename__ = 'background_job'
+    __table_args__ = (db.Index('ix_background_job_status', 'status', 'id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # import, export, reassign or reindex
+    status = db.Column(db.String(10), nullable=False, default='queued')  # queued, running, succeeded, failed or cancelled
+    params = db.Column(db.Text, nullable=False)  # JSON
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_by = db.Column(db.String(80), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<BackgroundJob {self.id} {self.kind} {self.status}>'
+
+# Process-local cache of department names, invalidated whenever a department is written. The
+# cache is one immutable snapshot replaced by a single assignment, so other threads never see it half built
+DEPARTMENT_CACHE_TTL = 300
+DepartmentSnapshot = namedtuple('DepartmentSnapshot', 'names ids loaded_at')
+_department_cache = {'snapshot': None}
+
+def invalidate_department_cache():
+    _department_cache['snapshot'] = None
+
+def _load_department_cache():
+    """Return the current DepartmentSnapshot: sorted names and a read-only name -> id mapping."""
+    snapshot = _department_cache['snapshot']
+    # The TTL bounds staleness for departments added by other worker processes
+    if snapshot is None or time.monotonic() - snapshot.loaded_at > DEPARTMENT_CACHE_TTL:
+        rows = db.session.query(Department.id, Department.name).order_by(Department.name).all()
+        snapshot = DepartmentSnapshot(tuple(name for _, name in rows),
+                                      MappingProxyType({name: dept_id for dept_id, name in rows}), time.monotonic())
+        _department_cache['snapshot'] = snapshot
+    return snapshot
+
+def get_department_names():
+    """Return the sorted list of department names from the process-local cache."""
+    return list(_load_department_cache().names)
+
+def rebuild_department_headcounts():
+    """Recompute every department headcount with one grouped aggregate."""
+    counts = dict(db.session.query(Employee.department_id, func.count(Employee.id)).group_by(Employee.department_id).all())
+    department_ids = [dept_id for (dept_id,) in db.session.query(Department.id).all()]
+    if department_ids:
+        db.session.execute(db.update(Department), [
+            {'id': dept_id, 'headcount': counts.get(dept_id, 0)} for dept_id in department_ids
+        ])
+    db.session.commit()
+
+def get_department_headcounts():
+    """Return (department, headcount) pairs for all departments."""
+    return db.session.query(Department.name, Department.headcount).order_by(Department.name).all()
+
+@event.listens_for(db.session, 'before_flush')
+def link_employee_departments(session, flush_context, instances):
+    # Point every new or re-departmented employee at its catalog row, creating it if needed
+    pending = {obj.name: obj for obj in session.new if isinstance(obj, Department)}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Employee) or not obj.department:
+            continue
+        if obj not in session.new and not db.inspect(obj).attrs.department.history.has_changes():
+            continue
+        
+        department_id = _load_department_cache().ids.get(obj.department)
+        if department_id is not None:
+            obj.department_id = department_id
+            continue
+        
+        with session.no_autoflush:
+            record = pending.get(obj.department) or Department.query.filter_by(name=obj.department).first()
+        if record is None:
+            record = Department(name=obj.department)
+            session.add(record)
+            pending[record.name] = record
+        obj.department_record = record
+
+def employee_attribute_deltas(session, attribute):
+    """Return {value: delta} for one Employee attribute across the objects in a flush."""
+    deltas = {}
+    for obj in session.new:
+        if isinstance(obj, Employee):
+            value = getattr(obj, attribute)
+            deltas[value] = deltas.get(value, 0) + 1
+    for obj in session.deleted:
+        if isinstance(obj, Employee):
+            history = db.inspect(obj).attrs[attribute].history
+            value = history.deleted[0] if history.deleted else getattr(obj, attribute)
+            deltas[value] = deltas.get(value, 0) - 1
+    for obj in session.dirty:
+        if isinstance(obj, Employee) and obj not in session.deleted:
+            history = db.inspect(obj).attrs[attribute].history
+            if history.deleted and history.added and history.deleted[0] != history.added[0]:
+                deltas[history.deleted[0]] = deltas.get(history.deleted[0], 0) - 1
+                deltas[history.added[0]] = deltas.get(history.added[0], 0) + 1
+    return {value: delta for value, delta in deltas.items() if value and delta}
+
+@event.listens_for(db.session, 'after_flush')
+def update_department_headcounts(session, flush_context):
+    if any(isinstance(obj, Department) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        invalidate_department_cache()
+        # A reload before the commit can pick up rows this transaction may still roll back
+        session.info['departments_written'] = True
+    
+    # Collect per-department deltas from the employees touched by this flush
+    deltas = employee_attribute_deltas(session, 'department')
+    if not deltas:
+        return
+    
+    # Apply the deltas in the same transaction as the employee writes
+    inserted_ids = {obj.id for obj in session.new if isinstance(obj, Department)}
+    apply_department_headcount_deltas(session.connection(), deltas, inserted_ids)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_department_cache(session):
+    if session.info.pop('departments_written', False):
+        invalidate_department_cache()
+
+def apply_department_headcount_deltas(connection, deltas, inserted_ids=()):
+    table = Department.__table__
+    connection.execute(
+        table.update().where(table.c.name == db.bindparam('dept_name')).values(
+            headcount=table.c.headcount + db.bindparam('delta')
+        ),
+        [{'dept_name': dept, 'delta': delta} for dept, delta in deltas.items()]
+    )
+    # Headcount is part of the departments feed record, so the change feed must announce it; departments
+    # inserted in the same transaction are announced by their insert entry instead, which has to come first
+    department_ids = connection.execute(db.select(table.c.id).where(table.c.name.in_(list(deltas)))).scalars().all()
+    record_changes(connection, 'departments', 'update', [id for id in department_ids if id not in inserted_ids])
+
+# Employee row versions; every write to an employee or its education/certification rows advances them
+def touch_employees(connection, employee_ids):
+    """Advance version and updated_at of employees changed by statements that bypass the flush."""
+    table = Employee.__table__
+    connection.execute(
+        table.update().where(table.c.id.in_(list(employee_ids))).values(
+            version=table.c.version + 1, updated_at=datetime.utcnow()
+        )
+    )
+    record_changes(connection, 'employees', 'update', employee_ids)
+    refresh_employee_rollups(connection, employee_ids)
+
+@event.listens_for(db.session, 'before_flush')
+def advance_employee_versions(session, flush_context, instances):
+    now = datetime.utcnow()
+    for obj in session.dirty:
+        if isinstance(obj, Employee) and session.is_modified(obj):
+            # Incremented in SQL so concurrent writers never hand out the same version
+            obj.version = Employee.version + 1
+            obj.updated_at = now
+
+@event.listens_for(db.session, 'after_flush')
+def advance_parent_employee_versions(session, flush_context):
+    touched, employee_ids = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, Employee):
+            touched.add(obj.id)
+        elif isinstance(obj, (Education, Certification)):
+            employee_ids.add(obj.employee_id)
+
+    # Employees written in this flush already carry a new version
+    employee_ids -= touched | {None}
+    if employee_ids:
+        touch_employees(session.connection(), employee_ids)
+
+# Change log capture. Entries are inserted in the transaction of the write they describe, and
+# SQLite admits one writer at a time, so sequence numbers become visible in increasing order
+CHANGE_LOG_ENTITIES = {Employee: 'employees', Department: 'departments'}
+CHANGE_LOG_RETENTION_DAYS = 30
+CHANGE_LOG_COMPACT_BATCH_SIZE = 5000
+
+def record_changes(connection, entity, op, ids):
+    now = datetime.utcnow()
+    rows = [{'entity': entity, 'entity_id': id, 'op': op, 'changed_at': now} for id in ids if id is not None]
+    if rows:
+        connection.execute(ChangeLogEntry.__table__.insert(), rows)
+
+@event.listens_for(db.session, 'after_flush')
+def record_flushed_changes(session, flush_context):
+    changes = {}
+    for op, objects in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            entity = CHANGE_LOG_ENTITIES.get(type(obj))
+            if entity is None:
+                continue
+            # Collection changes (a department gaining an employee) are not writes to the row itself
+            if op == 'update' and (obj in session.deleted or not session.is_modified(obj, include_collections=False)):
+                continue
+            changes.setdefault((entity, op), []).append(obj.id)
+    for (entity, op), ids in changes.items():
+        record_changes(session.connection(), entity, op, ids)
+
+def compact_change_log(before, batch_size=CHANGE_LOG_COMPACT_BATCH_SIZE):
+    """Delete entries older than `before` that a later entry for the same entity supersedes.
+    
+    Feed entries announce that an entity changed and the feed serves its current record, so
+    only the newest entry per entity is needed to bring any consumer up to date. Runs one
+    sequence range per transaction; returns the number of entries deleted.
+    """
+    later = db.aliased(ChangeLogEntry)
+    last_seq = db.session.query(func.max(ChangeLogEntry.seq)).filter(ChangeLogEntry.changed_at < before).scalar() or 0
+    deleted = 0
+    for start in range(0, last_seq + 1, batch_size):
+        result = db.session.execute(db.delete(ChangeLogEntry).where(
+            ChangeLogEntry.seq >= start, ChangeLogEntry.seq < start + batch_size, ChangeLogEntry.changed_at < before,
+            db.exists().where(later.entity == ChangeLogEntry.entity, later.entity_id == ChangeLogEntry.entity_id,
+                              later.seq > ChangeLogEntry.seq)
+        ))
+        db.session.commit()
+        deleted += result.rowcount
+    return deleted
+
+# Analytics rollup maintenance. The bucket expressions must match the backfill in migrate_db.py
+SALARY_BUCKET_WIDTH = 1000
+ROLLUP_DIMENSIONS = ('salary_bucket', 'hire_month', 'cert_month')
+
+def employee_rollup_select(employee_ids):
+    """SELECT the rollup cells the given employees belong in, as stored in employee_rollup_member."""
+    employee, certification = Employee.__table__, Certification.__table__
+    cert_months = db.select(
+        certification.c.employee_id,
+        func.strftime('%Y-%m', func.max(func.coalesce(certification.c.expiry_date, db.literal_column("'9999-12-31'")))).label('cert_month')
+    ).where(certification.c.employee_id.in_(employee_ids)).group_by(certification.c.employee_id).subquery()
+    salary = func.coalesce(employee.c.salary, 0)
+    return db.select(
+        employee.c.id.label('employee_id'), employee.c.department, salary.label('salary'),
+        db.cast(salary / SALARY_BUCKET_WIDTH, db.Integer).label('salary_bucket'),
+        func.strftime('%Y-%m', employee.c.hire_date).label('hire_month'),
+        func.coalesce(cert_months.c.cert_month, 'none').label('cert_month')
+    ).outerjoin(cert_months, cert_months.c.employee_id == employee.c.id).where(employee.c.id.in_(employee_ids))
+
+def refresh_employee_rollups(connection, employee_ids):
+    """Move the given employees' contributions to the rollup cells of their current rows.
+    
+    Works from the database state, so it can run after any kind of write (flush, Core
+    statements, bulk import) in the writer's transaction; unchanged employees cost nothing.
+    """
+    ids = sorted(set(employee_ids) - {None})
+    if not ids:
+        return
+    member = EmployeeRollupMember.__table__
+    old = {row.employee_id: tuple(row) for row in connection.execute(db.select(member).where(member.c.employee_id.in_(ids)))}
+    new = {row.employee_id: tuple(row) for row in connection.execute(employee_rollup_select(ids))}
+    changed = [id for id in ids if old.get(id) != new.get(id)]
+    if not changed:
+        return
+    
+    deltas = {}
+    for rows, sign in ((old, -1), (new, 1)):
+        for id in changed:
+            if id not in rows:
+                continue
+            row = dict(zip(member.c.keys(), rows[id]))
+            for dimension in ROLLUP_DIMENSIONS:
+                key = (row['department'], dimension, str(row[dimension]))
+                headcount, salary_sum = deltas.get(key, (0, 0.0))
+                deltas[key] = (headcount + sign, salary_sum + sign * row['salary'])
+    
+    rollup = DepartmentRollup.__table__
+    upsert = sqlite_insert(rollup)
+    upsert = upsert.on_conflict_do_update(index_elements=['department', 'dimension', 'bucket'], set_={
+        'headcount': rollup.c.headcount + upsert.excluded.headcount,
+        'salary_sum': rollup.c.salary_sum + upsert.excluded.salary_sum,
+    })
+    rows = [{'department': department, 'dimension': dimension, 'bucket': bucket, 'headcount': headcount, 'salary_sum': salary_sum}
+            for (department, dimension, bucket), (headcount, salary_sum) in deltas.items() if headcount or salary_sum]
+    if rows:
+        connection.execute(upsert, rows)
+    connection.execute(member.delete().where(member.c.employee_id.in_(changed)))
+    members = [dict(zip(member.c.keys(), new[id])) for id in changed if id in new]
+    if members:
+        connection.execute(member.insert(), members)
+
+@event.listens_for(db.session, 'after_flush')
+def refresh_flushed_employee_rollups(session, flush_context):
+    # Education/certification changes reach the rollups through touch_employees
+    employee_ids = {obj.id for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+                    if isinstance(obj, Employee) and (obj not in session.dirty or session.is_modified(obj, include_collections=False))}
+    if employee_ids:
+        refresh_employee_rollups(session.connection(), employee_ids)
+
+def get_department_rollups():
+    """Return the non-empty rollup cells as (department, dimension, bucket, headcount, salary_sum) rows."""
+    return db.session.query(DepartmentRollup.department, DepartmentRollup.dimension, DepartmentRollup.bucket,
+                            DepartmentRollup.headcount, DepartmentRollup.salary_sum).filter(DepartmentRollup.headcount > 0).all()
+
+# Process-local analytics summary. Every write that moves a rollup cell also appends to the
+# change log, whose newest entry survives compaction, so (head sequence, day) identifies the summary
+_analytics_cache = {'entry': None}
+
+def get_department_analytics():
+    """Return (version, summary) of the department analytics, recomputed only after writes or at midnight."""
+    version = (db.session.query(func.max(ChangeLogEntry.seq)).scalar(), date.today())
+    entry = _analytics_cache['entry']
+    if entry is None or entry[0] != version:
+        entry = _analytics_cache['entry'] = (version, summarize_rollups(get_department_rollups(), version[1], SALARY_BUCKET_WIDTH))
+    return entry
+
+# Certification expiry scan. Each run covers the expiry dates that entered the alert horizon
+# since the stored watermark, plus the certifications of employees written since the last run
+CERTIFICATION_EXPIRY_HORIZON_DAYS = 30
+CERTIFICATION_SCAN_BATCH_SIZE = 500
+CERTIFICATION_SCAN_INTERVAL = 3600
+CERTIFICATION_SCAN_JOB = 'certification_expiry_scan'
+EXPIRING_CERTIFICATIONS_LIMIT = 10
+
+def claim_job_run(name, interval):
+    """Record a run of job `name` unless one started less than `interval` seconds ago; True if claimed.
+    
+    Every serving process schedules the same jobs; the conditional upsert lets one of them run each interval.
+    """
+    now = datetime.utcnow()
+    statement = sqlite_insert(ScheduledJob.__table__).values(name=name, last_run_at=now)
+    statement = statement.on_conflict_do_update(
+        index_elements=['name'], set_={'last_run_at': now},
+        where=db.or_(ScheduledJob.__table__.c.last_run_at.is_(None),
+                     ScheduledJob.__table__.c.last_run_at <= now - timedelta(seconds=interval))
+    )
+    claimed = db.session.execute(statement).rowcount == 1
+    db.session.commit()
+    return claimed
+
+def get_job_state(name):
+    state = db.session.query(ScheduledJob.state).filter_by(name=name).scalar()
+    return json.loads(state) if state else {}
+
+def save_job_state(name, state):
+    statement = sqlite_insert(ScheduledJob.__table__).values(name=name, state=json.dumps(state))
+    db.session.execute(statement.on_conflict_do_update(index_elements=['name'], set_={'state': statement.excluded.state}))
+    db.session.commit()
+
+def queue_certification_alerts(rows):
+    if rows:
+        now = datetime.utcnow()
+        db.session.execute(sqlite_insert(CertificationAlert.__table__).on_conflict_do_nothing(), [
+            {'certification_id': id, 'employee_id': employee_id, 'expiry_date': expiry_date, 'created_at': now}
+            for id, employee_id, expiry_date in rows
+        ])
+    db.session.commit()
+    return len(rows)
+
+def scan_certification_expiry(today=None, batch_size=CERTIFICATION_SCAN_BATCH_SIZE):
+    """Queue an alert for every certification expiring within the horizon that has none yet.
+    
+    Certifications are read in (expiry_date, id) order from the expiry_date index, one batch
+    per transaction. Returns the number of certifications examined; rerunning is harmless,
+    as an alert already queued is left alone.
+    """
+    today = today or date.today()
+    through = today + timedelta(days=CERTIFICATION_EXPIRY_HORIZON_DAYS)
+    state = get_job_state(CERTIFICATION_SCAN_JOB)
+    head_seq = db.session.query(func.max(ChangeLogEntry.seq)).scalar() or 0
+    columns = (Certification.id, Certification.employee_id, Certification.expiry_date)
+    scanned = 0
+    
+    # Expiry dates that entered the horizon since the last run; earlier ones have expired by now
+    watermark = state.get('expiry_through')
+    after = max(date.fromisoformat(watermark), today - timedelta(days=1)) if watermark else today - timedelta(days=1)
+    cursor = (after, None)
+    while cursor[0] < through:
+        criteria = [Certification.expiry_date <= through]
+        if cursor[1] is None:
+            criteria.append(Certification.expiry_date > cursor[0])
+        else:
+            criteria.append(db.tuple_(Certification.expiry_date, Certification.id) > cursor)
+        rows = db.session.query(*columns).filter(*criteria).order_by(Certification.expiry_date, Certification.id).limit(batch_size).all()
+        scanned += queue_certification_alerts(rows)
+        if len(rows) < batch_size:
+            break
+        cursor = (rows[-1].expiry_date, rows[-1].id)
+    
+    # Certifications added or changed below the watermark since the last run, found through the
+    # change log entries of their employees
+    if watermark:
+        since = state.get('change_seq', 0)
+        for start in range(since, head_seq, CHANGE_LOG_COMPACT_BATCH_SIZE):
+            changed = db.session.query(ChangeLogEntry.entity_id).filter(
+                ChangeLogEntry.entity == 'employees', ChangeLogEntry.seq > start,
+                ChangeLogEntry.seq <= min(start + CHANGE_LOG_COMPACT_BATCH_SIZE, head_seq)
+            )
+            rows = db.session.query(*columns).filter(
+                Certification.employee_id.in_(changed), Certification.expiry_date >= today, Certification.expiry_date <= through
+            ).all()
+            scanned += queue_certification_alerts(rows)
+    
+    save_job_state(CERTIFICATION_SCAN_JOB, {'expiry_through': through.isoformat(), 'change_seq': head_seq})
+    return scanned
+
+def run_scheduled_certification_scan():
+    with app.app_context():
+        if claim_job_run(CERTIFICATION_SCAN_JOB, CERTIFICATION_SCAN_INTERVAL):
+            scan_certification_expiry()
+
+def start_scheduler():
+    """Start the background jobs of a serving process; called once in each worker."""
+    create_app()
+    app.extensions['scheduler'].start()
+
+def expiring_certifications(today, limit=EXPIRING_CERTIFICATIONS_LIMIT):
+    """Return (count, first `limit` (certification, employee) pairs) of certifications expiring within the horizon."""
+    window = Certification.expiry_date.between(today, today + timedelta(days=CERTIFICATION_EXPIRY_HORIZON_DAYS))
+    count = db.session.query(func.count(Certification.id)).filter(window).scalar()
+    rows = db.session.query(Certification, Employee).join(Employee, Employee.id == Certification.employee_id).filter(
+        window).order_by(Certification.expiry_date, Certification.id).limit(limit).all()
+    return count, rows
+
+# Conditional GET for employee pages, answered from row versions before any page loading
+def page_etag(*parts):
+    # Pages render the logged-in user's name and role, so they are part of the validator
+    key = '|'.join(str(part) for part in parts + (session.get('username'), session.get('is_admin')))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def set_validators(response, etag, last_modified=None):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # Cacheable by the browser only, and always revalidated
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified_response(etag, last_modified=None):
+    """Return a 304 response if the client's copy is still current, otherwise None."""
+    if '_flashes' in session:
+        # Pending flash messages have to be rendered into a fresh page
+        return None
+    if request.if_none_match:
+        current = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        current = last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+    else:
+        current = False
+    return set_validators(app.response_class(status=304), etag, last_modified) if current else None
+
+def employee_list_etag(*criteria):
+    """Validator for an employee listing: row count and newest row version of the filtered set."""
+    count, latest = db.session.query(func.count(Employee.id), func.max(Employee.updated_at)).filter(*criteria).one()
+    # Deletes only change the count, so listings carry an ETag but no Last-Modified
+    return page_etag(request.full_path, count, latest)
+
+# In-process autocomplete indexes for positions and departments
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_TTL = 300
+AUTOCOMPLETE_MAX_AGE = 60
+
+class PrefixIndex:
+    """Sorted index of word prefixes over a set of values, ranked by frequency.
+    
+    Requests search it from several threads while commits apply deltas, so loading,
+    applying and searching all hold the index lock.
+    """
+    
+    def __init__(self, loader, keep_empty=False):
+        self.loader = loader
+        self.keep_empty = keep_empty
+        self.lock = threading.Lock()
+        self.counts = None
+        self.keys = []
+        self.loaded_at = 0
+    
+    @staticmethod
+    def _words(value):
+        # Index every word start so "eng" finds "Software Engineer"
+        lowered = value.lower()
+        words = lowered.split()
+        return {lowered} | {' '.join(words[i:]) for i in range(1, len(words))}
+    
+    def _ensure_loaded(self):
+        # Called with the lock held; the TTL bounds staleness from writes made by other worker processes
+        if self.counts is None or time.monotonic() - self.loaded_at > AUTOCOMPLETE_TTL:
+            self.counts = {value: count for value, count in self.loader() if value}
+            self.keys = sorted((word, value) for value in self.counts for word in self._words(value))
+            self.loaded_at = time.monotonic()
+    
+    def apply(self, deltas):
+        """Incrementally apply {value: delta} changes to an already loaded index."""
+        with self.lock:
+            if self.counts is not None and deltas:
+                self._apply(deltas)
+    
+    def _apply(self, deltas):
+        for value, delta in deltas.items():
+            old_count = self.counts.get(value)
+            new_count = (old_count or 0) + delta
+            if new_count > 0 or self.keep_empty:
+                if old_count is None:
+                    for word in self._words(value):
+                        bisect.insort(self.keys, (word, value))
+                self.counts[value] = max(new_count, 0)
+            elif old_count is not None:
+                del self.counts[value]
+                for word in self._words(value):
+                    position = bisect.bisect_left(self.keys, (word, value))
+                    if position < len(self.keys) and self.keys[position] == (word, value):
+                        del self.keys[position]
+    
+    def search(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """Return up to `limit` values with a word starting with `prefix`, most frequent first."""
+        prefix = prefix.strip().lower()
+        with self.lock:
+            self._ensure_loaded()
+            if not prefix:
+                candidates = self.counts
+            else:
+                candidates = set()
+                position = bisect.bisect_left(self.keys, (prefix,))
+                while position < len(self.keys) and self.keys[position][0].startswith(prefix):
+                    candidates.add(self.keys[position][1])
+                    position += 1
+            return heapq.nsmallest(limit, candidates, key=lambda value: (-self.counts[value], value))
+
+position_index = PrefixIndex(
+    lambda: db.session.query(Employee.position, func.count(Employee.id)).group_by(Employee.position).all()
+)
+department_index = PrefixIndex(
+    lambda: db.session.query(Department.name, Department.headcount).all(),
+    keep_empty=True
+)
+
+def autocomplete_response(index, query):
+    response = jsonify(index.search(query))
+    response.headers['Cache-Control'] = f'private, max-age={AUTOCOMPLETE_MAX_AGE}'
+    # Validated by content: every worker process keeps its own index, loaded at its own time
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    return response.make_conditional(request)
+
+@event.listens_for(db.session, 'after_flush')
+def collect_autocomplete_deltas(session, flush_context):
+    # Held until commit so rolled-back writes never reach the indexes
+    pending = session.info.setdefault('autocomplete_deltas', {'position': {}, 'department': {}})
+    for attribute in ('position', 'department'):
+        for value, delta in employee_attribute_deltas(session, attribute).items():
+            pending[attribute][value] = pending[attribute].get(value, 0) + delta
+    for obj in session.new:
+        if isinstance(obj, Department):
+            pending['department'].setdefault(obj.name, 0)
+
+@event.listens_for(db.session, 'after_commit')
+def apply_autocomplete_deltas(session):
+    pending = session.info.pop('autocomplete_deltas', None)
+    if pending:
+        position_index.apply(pending['position'])
+        department_index.apply(pending['department'])
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_autocomplete_deltas(session):
+    session.info.pop('autocomplete_deltas', None)
+
+# Profile form parsing and education/certification reconciliation
+def parse_form_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+def parse_row_id(value):
+    return int(value) if value and value.isdigit() else None
+
+def parse_education_rows(form):
+    """Read the numbered education fields of a profile form into a list of dicts."""
+    rows = []
+    for i in range(int(form.get('education_count', 0))):
+        if form.get(f'institution_{i}'):
+            rows.append({
+                'id': parse_row_id(form.get(f'education_id_{i}')),
+                'institution': form.get(f'institution_{i}'),
+                'degree': form.get(f'degree_{i}'),
+                'field_of_study': form.get(f'field_of_study_{i}'),
+                'start_date': parse_form_date(form.get(f'edu_start_date_{i}')),
+                'end_date': parse_form_date(form.get(f'edu_end_date_{i}')),
+                'description': form.get(f'edu_description_{i}', '')
+            })
+    return rows
+
+def parse_certification_rows(form):
+    """Read the numbered certification fields of a profile form into a list of dicts."""
+    rows = []
+    for i in range(int(form.get('certification_count', 0))):
+        if form.get(f'cert_name_{i}'):
+            rows.append({
+                'id': parse_row_id(form.get(f'cert_id_{i}')),
+                'name': form.get(f'cert_name_{i}'),
+                'issuing_organization': form.get(f'issuing_organization_{i}'),
+                'issue_date': parse_form_date(form.get(f'issue_date_{i}')),
+                'expiry_date': parse_form_date(form.get(f'expiry_date_{i}')),
+                'credential_id': form.get(f'credential_id_{i}', ''),
+                'credential_url': form.get(f'credential_url_{i}', '')
+            })
+    return rows
+
+def reconcile_employee_rows(model, employee_id, rows):
+    """Bring an employee's Education/Certification rows in line with the submitted ones.
+    
+    Rows are matched by id; only changed rows are updated, unmatched submitted rows are
+    inserted and existing rows that were not submitted are deleted, each as one bulk statement.
+    The caller commits.
+    """
+    existing = {row.id: row for row in model.query.filter_by(employee_id=employee_id).all()}
+    inserts, updates, kept = [], [], set()
+    
+    for row in rows:
+        values = {key: value for key, value in row.items() if key != 'id'}
+        current = existing.get(row['id'])
+        if current is None or current.id in kept:
+            inserts.append(dict(values, employee_id=employee_id))
+            continue
+        kept.add(current.id)
+        # Treat '' and None as equal so untouched optional fields don't count as changes
+        changes = {key: value for key, value in values.items() if (getattr(current, key) or None) != (value or None)}
+        if changes:
+            updates.append(dict(changes, id=current.id))
+    
+    deleted_ids = [row_id for row_id in existing if row_id not in kept]
+    if deleted_ids:
+        db.session.execute(db.delete(model).where(model.id.in_(deleted_ids)))
+    if updates:
+        db.session.execute(db.update(model), updates)
+    if inserts:
+        db.session.execute(db.insert(model), inserts)
+    if deleted_ids or updates or inserts:
+        touch_employees(db.session.connection(), [employee_id])
+
+def create_employee_profile(employee, educations, certifications, user=None):
+    """Create an employee with its education/certification rows, and link `user` to it, in one transaction.
+    
+    The employee is flushed for its id, the child rows (as parsed by parse_education_rows /
+    parse_certification_rows) go in with one executemany insert per table, and everything is
+    committed once. On IntegrityError the session is rolled back and the error re-raised.
+    """
+    try:
+        db.session.add(employee)
+        db.session.flush()
+        if educations:
+            db.session.execute(db.insert(Education), [
+                dict({key: value for key, value in row.items() if key != 'id'}, employee_id=employee.id) for row in educations
+            ])
+        if certifications:
+            db.session.execute(db.insert(Certification), [
+                dict({key: value for key, value in row.items() if key != 'id'}, employee_id=employee.id) for row in certifications
+            ])
+            refresh_employee_rollups(db.session.connection(), [employee.id])
+        if user is not None:
+            user.employee_id = employee.id
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise
+    return employee
+
+# Keyset (seek) pagination for employee listings
+EMPLOYEE_PAGE_SIZE = 50
+EMPLOYEE_MAX_PAGE_SIZE = 500
+EMPLOYEE_STREAM_BATCH_SIZE = 500
+EMPLOYEE_SORT_KEYS = {
+    'id': Employee.id,
+    'name': Employee.last_name,
+    'department': Employee.department,
+    'position': Employee.position,
+    'hire_date': Employee.hire_date,
+}
+
+class KeysetPage:
+    def __init__(self, items, sort, order, per_page, after, next_cursor):
+        self.items = items
+        self.sort = sort
+        self.order = order
+        self.per_page = per_page
+        self.after = after
+        self.next_cursor = next_cursor
+
+def encode_cursor(value, id):
+    if isinstance(value, date):
+        value = value.isoformat()
+    payload = json.dumps([value, id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor, sort):
+    """Return the (sort value, id) of a cursor; raises ValueError for a malformed one."""
+    try:
+        value, id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if sort == 'hire_date':
+            value = date.fromisoformat(value)
+        return value, int(id)
+    except (ValueError, TypeError):
+        raise ValueError('malformed cursor')
+
+def employee_list_args(args, sort_keys=EMPLOYEE_SORT_KEYS, default_sort='id'):
+    """Read and validate the sort/order/page-size listing parameters."""
+    sort = args.get('sort', default_sort)
+    if sort not in sort_keys:
+        sort = default_sort
+    order = 'desc' if args.get('order') == 'desc' else 'asc'
+    try:
+        per_page = min(max(int(args.get('per_page', EMPLOYEE_PAGE_SIZE)), 1), EMPLOYEE_MAX_PAGE_SIZE)
+    except ValueError:
+        per_page = EMPLOYEE_PAGE_SIZE
+    return sort, order, per_page
+
+# Sort keys that can be NULL. A row-value comparison with a NULL is never true, so the keyset
+# seek would skip those rows; they are ordered after all values and compared through COALESCE
+NULLABLE_SORT_KEYS = {'salary'}
+
+def sort_key_columns(sort, sort_keys=EMPLOYEE_SORT_KEYS):
+    # Employee.id breaks ties so the order is total and the keyset cursor is unambiguous
+    if sort == 'id':
+        return [Employee.id]
+    column = sort_keys[sort]
+    if sort in NULLABLE_SORT_KEYS:
+        return [column.is_(None), func.coalesce(column, 0), Employee.id]
+    return [column, Employee.id]
+
+def sort_key_values(sort, value, id):
+    """The values of sort_key_columns for a row whose sort column holds `value`."""
+    if sort in NULLABLE_SORT_KEYS:
+        return (value is None, 0 if value is None else value, id)
+    return (value, id)
+
+def sort_employee_query(query, sort, order, sort_keys=EMPLOYEE_SORT_KEYS):
+    columns = sort_key_columns(sort, sort_keys)
+    if order == 'desc':
+        return query.order_by(*[column.desc() for column in columns])
+    return query.order_by(*columns)
+
+def keyset_paginate(query, args, sort_keys=EMPLOYEE_SORT_KEYS, default_sort='id'):
+    """Return one KeysetPage of the query, seeking past the cursor in args['after']."""
+    sort, order, per_page = employee_list_args(args, sort_keys, default_sort)
+    after = args.get('after')
+    column = sort_keys[sort]
+    
+    if after:
+        try:
+            value, last_id = decode_cursor(after, sort)
+        except ValueError:
+            abort(400)
+        if sort == 'id':
+            query = query.filter(Employee.id < last_id if order == 'desc' else Employee.id > last_id)
+        else:
+            key, cursor = db.tuple_(*sort_key_columns(sort, sort_keys)), sort_key_values(sort, value, last_id)
+            query = query.filter(key < cursor if order == 'desc' else key > cursor)
+    
+    # Fetch one extra row to find out whether there is a next page
+    items = sort_employee_query(query, sort, order, sort_keys).limit(per_page + 1).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), last.id)
+    
+    return KeysetPage(items, sort, order, per_page, after, next_cursor)
+
+def stream_employee_list(template_name, query, **context):
+    """Stream a listing template, yielding table rows as they are read in batches."""
+    sort, order, per_page = employee_list_args(request.args)
+    employees = sort_employee_query(query, sort, order).yield_per(EMPLOYEE_STREAM_BATCH_SIZE)
+    return app.response_class(stream_template(template_name, employees=employees, page=None, **context))
+
+def url_for_page(**changes):
+    """URL of the current page with some query parameters replaced; a None value drops the parameter."""
+    args = request.args.to_dict(flat=False)
+    args.update(changes)
+    return url_for(request.endpoint, **request.view_args, **{name: value for name, value in args.items() if value is not None})
+
+app.jinja_env.globals['url_for_page'] = url_for_page
+
+# Columns shown by the employee tables; listings load nothing else
+EMPLOYEE_LIST_COLUMNS = (Employee.id, Employee.first_name, Employee.last_name, Employee.email,
+                         Employee.department, Employee.position, Employee.hire_date, Employee.version)
+
+# Rendered employee table rows, cached per row version so listings are mostly assembled from cache
+EMPLOYEE_ROW_TEMPLATE = '_employee_row.html'
+EMPLOYEE_ROW_BATCH_SIZE = 100
+_employee_row_template = {'digest': None}
+
+def employee_row_template_digest():
+    # Part of every key, so a changed row template never serves fragments rendered by the old one
+    if _employee_row_template['digest'] is None:
+        source, _, _ = app.jinja_loader.get_source(app.jinja_env, EMPLOYEE_ROW_TEMPLATE)
+        _employee_row_template['digest'] = hashlib.sha1(source.encode()).hexdigest()[:12]
+    return _employee_row_template['digest']
+
+def employee_rows(employees, show_department=True):
+    """Yield each employee's rendered table row, rendering only the rows missing from the fragment cache."""
+    cache = app.extensions['fragment_cache']
+    render_row = get_template_attribute(EMPLOYEE_ROW_TEMPLATE, 'employee_row')
+    variant = f"{employee_row_template_digest()}-{'department' if show_department else 'plain'}"
+    employees = iter(employees)
+    # Looked up in batches so a shared cache costs one round trip per batch, also when streaming
+    while batch := list(itertools.islice(employees, EMPLOYEE_ROW_BATCH_SIZE)):
+        keys = [(employee.id, variant, employee.version) for employee in batch]
+        cached = cache.get_many(keys)
+        rendered = {}
+        for key, employee in zip(keys, batch):
+            html = cached.get(key)
+            if html is None:
+                # Indentation is dropped; it is most of the bytes of a row
+                html = rendered[key] = '\n'.join(filter(None, (line.strip() for line in render_row(employee, show_department).splitlines())))
+            yield Markup(html)
+        if rendered:
+            cache.set_many(rendered)
+
+app.jinja_env.globals['employee_rows'] = employee_rows
+
+@event.listens_for(db.session, 'after_flush')
+def invalidate_employee_fragments(session, flush_context):
+    employee_ids = {obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, Employee)}
+    if employee_ids and 'fragment_cache' in app.extensions:
+        app.extensions['fragment_cache'].invalidate(employee_ids)
+
+# Full-text search over employees; the FTS5 table and its sync triggers are created by migrate_db.py
+EMPLOYEE_SEARCH_COLUMNS = ['first_name', 'last_name', 'position', 'department', 'email', 'notes']
+employee_fts = db.table('employee_fts', db.column('rowid'), db.column('rank'))
+
+def build_search_match(query):
+    """Turn free text into an FTS5 MATCH expression, or None if no term is long enough."""
+    # Trigram indexes can only match terms of at least three characters
+    terms = [term for term in query.split() if len(term) >= 3]
+    if not terms:
+        return None
+    return ' AND '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+# Faceted employee search: every filter is applied in SQL, and the counts of all facets
+# come from a single grouped query
+SEARCH_SORT_KEYS = dict(EMPLOYEE_SORT_KEYS, salary=Employee.salary, relevance=employee_fts.c.rank)
+SEARCH_FACETS = ('department', 'position', 'salary_band', 'certification')
+# (key, label, lower bound, upper bound); ascending and contiguous
+SALARY_BANDS = [
+    ('under-50k', 'Under 50k', None, 50000),
+    ('50k-100k', '50k - 100k', 50000, 100000),
+    ('100k-150k', '100k - 150k', 100000, 150000),
+    ('150k-plus', '150k and over', 150000, None),
+]
+CERTIFICATION_STATUSES = {'active': 'Current certification', 'expired': 'Only expired', 'none': 'No certifications'}
+
+def search_filters(args):
+    """Read the search text and the facet and hire-date filters from the request arguments."""
+    def date_arg(name):
+        try:
+            return parse_form_date(args.get(name))
+        except ValueError:
+            return None
+    
+    bands = {key for key, _, _, _ in SALARY_BANDS}
+    return {
+        'query': args.get('query', '').strip(),
+        'department': args.getlist('department'),
+        'position': args.getlist('position'),
+        'salary_band': [band for band in args.getlist('salary_band') if band in bands],
+        'certification': [status for status in args.getlist('certification') if status in CERTIFICATION_STATUSES],
+        'hired_from': date_arg('hired_from'),
+        'hired_to': date_arg('hired_to'),
+    }
+
+def salary_band_expression():
+    return db.case(*[(func.coalesce(Employee.salary, 0) < upper, key) for key, _, _, upper in SALARY_BANDS if upper is not None],
+                   else_=SALARY_BANDS[-1][0])
+
+def certification_status_expression(today):
+    current = db.exists().where(Certification.employee_id == Employee.id,
+                                db.or_(Certification.expiry_date.is_(None), Certification.expiry_date >= today))
+    held = db.exists().where(Certification.employee_id == Employee.id)
+    return db.case((current, 'active'), (held, 'expired'), else_='none')
+
+def search_base_query(filters):
+    """Employees matching the search text and hire-date range, before any facet is applied."""
+    query = Employee.query
+    if filters['query']:
+        match = build_search_match(filters['query'])
+        if match is None:
+            # Too short for the trigram index; fall back to a scan
+            pattern = f"%{filters['query']}%"
+            query = query.filter(db.or_(*[getattr(Employee, column).ilike(pattern) for column in EMPLOYEE_SEARCH_COLUMNS]))
+        else:
+            query = query.join(employee_fts, employee_fts.c.rowid == Employee.id).filter(
+                db.text('employee_fts MATCH :match').bindparams(match=match))
+    if filters['hired_from']:
+        query = query.filter(Employee.hire_date >= filters['hired_from'])
+    if filters['hired_to']:
+        query = query.filter(Employee.hire_date <= filters['hired_to'])
+    return query
+
+def facet_criteria(filters, today):
+    """SQL criteria for the selected values of each facet."""
+    criteria = {}
+    if filters['department']:
+        criteria['department'] = Employee.department.in_(filters['department'])
+    if filters['position']:
+        criteria['position'] = Employee.position.in_(filters['position'])
+    if filters['salary_band']:
+        # Plain ranges rather than the band expression, so the salary column stays usable by indexes
+        criteria['salary_band'] = db.or_(*[
+            db.and_(*([Employee.salary >= lower] if lower is not None else []),
+                    *([Employee.salary < upper] if upper is not None else []))
+            for key, _, lower, upper in SALARY_BANDS if key in filters['salary_band']
+        ])
+    if filters['certification']:
+        criteria['certification'] = certification_status_expression(today).in_(filters['certification'])
+    return criteria
+
+def search_facet_counts(base, filters, today):
+    """Return (total, {facet: {value: count}}) for the search, from one grouped query.
+    
+    Each facet is counted with the other facets' selections applied but not its own, so
+    the values a user could switch to keep their counts.
+    """
+    dimensions = [Employee.department.label('department'), Employee.position.label('position'),
+                  salary_band_expression().label('salary_band'), certification_status_expression(today).label('certification')]
+    cells = base.with_entities(*dimensions, func.count()).group_by(*dimensions).order_by(None).all()
+    
+    selected = {facet: set(filters[facet]) for facet in SEARCH_FACETS if filters[facet]}
+    counts = {facet: {} for facet in SEARCH_FACETS}
+    total = 0
+    for *values, count in cells:
+        cell = dict(zip(SEARCH_FACETS, values))
+        misses = [facet for facet, chosen in selected.items() if cell[facet] not in chosen]
+        if not misses:
+            total += count
+        for facet in SEARCH_FACETS:
+            if not misses or misses == [facet]:
+                counts[facet][cell[facet]] = counts[facet].get(cell[facet], 0) + count
+    for facet, chosen in selected.items():
+        for value in chosen:
+            counts[facet].setdefault(value, 0)
+    return total, counts
+
+def search_employees_page(filters, args, today):
+    """Return (page, total, facet counts) for a faceted search."""
+    base = search_base_query(filters)
+    total, counts = search_facet_counts(base, filters, today)
+    
+    query = base.filter(*facet_criteria(filters, today).values()).options(db.load_only(*EMPLOYEE_LIST_COLUMNS))
+    sort_keys = SEARCH_SORT_KEYS
+    if filters['query'] and build_search_match(filters['query']):
+        query = query.options(db.with_expression(Employee.rank, employee_fts.c.rank))
+        default_sort = 'relevance'
+    else:
+        # Nothing to rank by
+        sort_keys = {key: column for key, column in SEARCH_SORT_KEYS.items() if key != 'relevance'}
+        default_sort = 'name'
+    return keyset_paginate(query, args, sort_keys, default_sort), total, counts
+
+# Bulk employee import from CSV or NDJSON
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = ('csv', 'ndjson')
+IMPORT_REQUIRED_FIELDS = ['first_name', 'last_name', 'email', 'phone', 'department', 'position', 'hire_date', 'current_address']
+IMPORT_EDUCATION_REQUIRED_FIELDS = ['institution', 'degree', 'field_of_study', 'start_date']
+IMPORT_CERTIFICATION_REQUIRED_FIELDS = ['name', 'issuing_organization', 'issue_date']
+
+def import_format_for(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return 'ndjson' if extension in ('ndjson', 'jsonl', 'json') else 'csv'
+
+def iter_import_records(stream, fmt):
+    """Yield (line_number, record) pairs from a text stream without reading it all into memory."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # CSV carries nested educations/certifications as JSON arrays in a single column
+            for key in ('educations', 'certifications'):
+                if record.get(key):
+                    try:
+                        record[key] = json.loads(record[key])
+                    except ValueError:
+                        record[key] = f'invalid JSON in {key} column'
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, 'invalid JSON'
+
+def _import_date(record, field, required=True):
+    value = record.get(field)
+    if not value:
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f'{field} must be a YYYY-MM-DD date')
+
+def _import_children(record, key, required_fields, build):
+    rows = record.get(key) or []
+    if not isinstance(rows, list):
+        raise ValueError(rows if isinstance(rows, str) else f'{key} must be a list')
+    children = []
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f'{key} entries must be objects')
+        missing = [field for field in required_fields if not row.get(field)]
+        if missing:
+            raise ValueError(f'{key} entry is missing {", ".join(missing)}')
+        children.append(build(row))
+    return children
+
+def validate_import_record(record, emails, employee_ids):
+    """Validate one import record against the known emails/IDs; return (employee, educations, certifications)."""
+    if not isinstance(record, dict):
+        raise ValueError(record if isinstance(record, str) else 'record must be an object')
+    missing = [field for field in IMPORT_REQUIRED_FIELDS if not record.get(field)]
+    if missing:
+        raise ValueError(f'missing {", ".join(missing)}')
+    
+    email = str(record['email']).strip()
+    if email in emails:
+        raise ValueError(f'email {email} already exists')
+    employee_id = str(record.get('employee_id') or '').strip() or None
+    if employee_id and employee_id in employee_ids:
+        raise ValueError(f'employee ID {employee_id} already exists')
+    try:
+        salary = float(record.get('salary') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('salary must be a number')
+    
+    employee = {
+        'employee_id': employee_id,
+        'first_name': str(record['first_name']),
+        'last_name': str(record['last_name']),
+        'email': email,
+        'phone': str(record['phone']),
+        'department': str(record['department']),
+        'position': str(record['position']),
+        'hire_date': _import_date(record, 'hire_date'),
+        'current_address': str(record['current_address']),
+        'permanent_address': str(record.get('permanent_address') or ''),
+        'salary': salary,
+        'notes': str(record.get('notes') or '')
+    }
+    educations = _import_children(record, 'educations', IMPORT_EDUCATION_REQUIRED_FIELDS, lambda row: {
+        'institution': row['institution'],
+        'degree': row['degree'],
+        'field_of_study': row['field_of_study'],
+        'start_date': _import_date(row, 'start_date'),
+        'end_date': _import_date(row, 'end_date', required=False),
+        'description': row.get('description') or ''
+    })
+    certifications = _import_children(record, 'certifications', IMPORT_CERTIFICATION_REQUIRED_FIELDS, lambda row: {
+        'name': row['name'],
+        'issuing_organization': row['issuing_organization'],
+        'issue_date': _import_date(row, 'issue_date'),
+        'expiry_date': _import_date(row, 'expiry_date', required=False),
+        'credential_id': row.get('credential_id') or '',
+        'credential_url': row.get('credential_url') or ''
+    })
+    
+    # Reserve the keys so duplicates later in the same file are rejected too
+    emails.add(email)
+    if employee_id:
+        employee_ids.add(employee_id)
+    return employee, educations, certifications
+
+def _load_import_chunk(chunk):
+    """Insert one validated chunk with executemany statements in a single transaction."""
+    connection = db.session.connection()
+    
+    # Make sure every department in the chunk exists in the catalog
+    departments = {employee['department'] for _, employee, _, _ in chunk}
+    known = _load_department_cache().ids
+    missing = [{'name': name, 'headcount': 0, 'created_at': datetime.utcnow()} for name in departments if name not in known]
+    inserted = {}
+    if missing:
+        connection.execute(sqlite_insert(Department.__table__).on_conflict_do_nothing(), missing)
+        # Read the new ids inside this transaction; the shared cache only learns them once it commits
+        departments_table = Department.__table__
+        known = dict(known)
+        inserted = dict(connection.execute(
+            db.select(departments_table.c.name, departments_table.c.id).where(
+                departments_table.c.name.in_([row['name'] for row in missing]))
+        ).all())
+        known.update(inserted)
+        record_changes(connection, 'departments', 'insert', list(inserted.values()))
+    
+    employee_rows = [dict(employee, department_id=known[employee['department']], created_at=datetime.utcnow())
+                     for _, employee, _, _ in chunk]
+    table = Employee.__table__
+    connection.execute(table.insert(), employee_rows)
+    
+    # Look the new ids up by (unique, indexed) email rather than RETURNING, which SQLite
+    # can only deliver in parameter order one row at a time
+    ids = dict(connection.execute(
+        db.select(table.c.email, table.c.id).where(table.c.email.in_([row['email'] for row in employee_rows]))
+    ).all())
+    
+    education_rows = [dict(row, employee_id=ids[employee['email']], created_at=datetime.utcnow())
+                      for _, employee, educations, _ in chunk for row in educations]
+    certification_rows = [dict(row, employee_id=ids[employee['email']], created_at=datetime.utcnow())
+                          for _, employee, _, certifications in chunk for row in certifications]
+    if education_rows:
+        connection.execute(Education.__table__.insert(), education_rows)
+    if certification_rows:
+        connection.execute(Certification.__table__.insert(), certification_rows)
+    
+    department_deltas, position_deltas = {}, {}
+    for row in employee_rows:
+        department_deltas[row['department']] = department_deltas.get(row['department'], 0) + 1
+        position_deltas[row['position']] = position_deltas.get(row['position'], 0) + 1
+    apply_department_headcount_deltas(connection, department_deltas, set(inserted.values()))
+    record_changes(connection, 'employees', 'insert', sorted(ids.values()))
+    refresh_employee_rollups(connection, ids.values())
+    db.session.commit()
+    if missing:
+        invalidate_department_cache()
+    
+    position_index.apply(position_deltas)
+    department_index.apply(department_deltas)
+
+def import_employee_records(records, chunk_size=IMPORT_CHUNK_SIZE, on_chunk=None):
+    """Load (line_number, record) pairs into the database in chunks.
+    
+    Records are validated against preloaded sets of existing emails and employee IDs and
+    loaded in chunks of `chunk_size`, one transaction per chunk; `on_chunk(imported, errors)`
+    is called after each. Returns a summary dict with the number of imported employees and
+    a list of (line_number, message) errors.
+    """
+    emails = {email for (email,) in db.session.query(Employee.email)}
+    employee_ids = {employee_id for (employee_id,) in db.session.query(Employee.employee_id) if employee_id}
+    imported, errors, chunk = 0, [], []
+    
+    def flush_chunk():
+        nonlocal imported
+        try:
+            _load_import_chunk(chunk)
+            imported += len(chunk)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            errors.extend((line_number, f'chunk rejected by database: {e.__class__.__name__}') for line_number, _, _, _ in chunk)
+        chunk.clear()
+        if on_chunk:
+            on_chunk(imported, errors)
+    
+    for line_number, record in records:
+        try:
+            chunk.append((line_number,) + validate_import_record(record, emails, employee_ids))
+        except ValueError as e:
+            errors.append((line_number, str(e)))
+        if len(chunk) >= chunk_size:
+            flush_chunk()
+    if chunk:
+        flush_chunk()
+    
+    return {'imported': imported, 'errors': errors}
+
+def import_employees(stream, fmt, chunk_size=IMPORT_CHUNK_SIZE, on_chunk=None):
+    """Stream employee records from a CSV/NDJSON text stream into the database."""
+    return import_employee_records(iter_import_records(stream, fmt), chunk_size, on_chunk)
+
+# Constant-memory streaming export of employees with their education/certification records
+EXPORT_BATCH_SIZE = 500
+EXPORT_FORMATS = ('csv', 'ndjson', 'bundle')
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson', 'bundle': 'application/zip'}
+EXPORT_EXTENSIONS = {'csv': 'csv', 'ndjson': 'ndjson', 'bundle': 'zip'}
+EXPORT_EMPLOYEE_COLUMNS = [column.key for column in Employee.__table__.columns if column.key != 'department_id']
+EXPORT_EDUCATION_COLUMNS = [column.key for column in Education.__table__.columns]
+EXPORT_CERTIFICATION_COLUMNS = [column.key for column in Certification.__table__.columns]
+
+class _CsvLine:
+    # csv.writer target that hands each formatted line back instead of buffering it
+    def write(self, value):
+        return value
+
+class _ZipStream(io.RawIOBase):
+    # Unseekable sink for zipfile; the generator drains what has been written so far
+    def __init__(self):
+        self.chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def _export_record(obj, columns):
+    return {column: _export_value(getattr(obj, column)) for column in columns}
+
+def filtered_employee_query(department=None, hired_from=None, hired_to=None):
+    """Return an Employee query with the export filters applied in SQL."""
+    query = Employee.query
+    if department:
+        query = query.filter(Employee.department == department)
+    if hired_from:
+        query = query.filter(Employee.hire_date >= hired_from)
+    if hired_to:
+        query = query.filter(Employee.hire_date <= hired_to)
+    return query
+
+def _iter_export_profiles(query):
+    # yield_per keeps one batch of rows alive at a time; selectinload fetches each
+    # batch's children with one IN query per relationship
+    return query.options(*PROFILE_LOAD_OPTIONS).order_by(Employee.id).yield_per(EXPORT_BATCH_SIZE)
+
+def export_ndjson(query):
+    """Yield one JSON line per employee with nested educations and certifications."""
+    for employee in _iter_export_profiles(query):
+        yield json.dumps(employee_profile_dict(employee)) + '\n'
+
+def export_csv(query):
+    """Yield CSV lines, one per employee, with related records as JSON columns (the import layout)."""
+    writer = csv.writer(_CsvLine())
+    yield writer.writerow(EXPORT_EMPLOYEE_COLUMNS + ['educations', 'certifications'])
+    for employee in _iter_export_profiles(query):
+        yield writer.writerow(
+            [_export_value(getattr(employee, column)) for column in EXPORT_EMPLOYEE_COLUMNS] +
+            [json.dumps([_export_record(row, EXPORT_EDUCATION_COLUMNS) for row in employee.educations]),
+             json.dumps([_export_record(row, EXPORT_CERTIFICATION_COLUMNS) for row in employee.certifications])]
+        )
+
+def _iter_table_rows(query, columns):
+    # Plain column tuples, no ORM objects; the query only selects the exported columns
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield [_export_value(value) for value in row]
+
+def export_bundle(query):
+    """Yield a zip archive holding one CSV per table (employees, educations, certifications)."""
+    employee_ids = query.with_entities(Employee.id)
+    tables = [
+        ('employees.csv', EXPORT_EMPLOYEE_COLUMNS,
+         query.with_entities(*[getattr(Employee, column) for column in EXPORT_EMPLOYEE_COLUMNS]).order_by(Employee.id)),
+        ('educations.csv', EXPORT_EDUCATION_COLUMNS,
+         db.session.query(*[getattr(Education, column) for column in EXPORT_EDUCATION_COLUMNS]).filter(
+             Education.employee_id.in_(employee_ids)).order_by(Education.id)),
+        ('certifications.csv', EXPORT_CERTIFICATION_COLUMNS,
+         db.session.query(*[getattr(Certification, column) for column in EXPORT_CERTIFICATION_COLUMNS]).filter(
+             Certification.employee_id.in_(employee_ids)).order_by(Certification.id)),
+    ]
+    
+    sink = _ZipStream()
+    writer = csv.writer(_CsvLine())
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, columns, table_query in tables:
+            with archive.open(name, 'w', force_zip64=True) as member:
+                member.write(writer.writerow(columns).encode())
+                for row in _iter_table_rows(table_query, columns):
+                    member.write(writer.writerow(row).encode())
+                    if len(sink.chunks) > 16:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+EXPORTERS = {'csv': export_csv, 'ndjson': export_ndjson, 'bundle': export_bundle}
+
+# Background jobs. Admin routes queue a job and return at once; a pool thread claims and runs it,
+# reporting progress to the job row, which is also where a cancel is requested
+JOB_STALE_AFTER = 600
+JOB_RECOVERY_INTERVAL = 60
+JOB_RECOVERY_JOB = 'background_job_recovery'
+JOB_FILE_RETENTION_DAYS = 7
+JOB_REPORTED_ERRORS = 500
+JOB_ACTIVE_STATUSES = ('queued', 'running')
+JOB_LIST_LIMIT = 50
+JOB_PROGRESS_EVERY = 500
+REASSIGN_BATCH_SIZE = 500
+
+class JobCancelled(Exception):
+    pass
+
+class JobProgress:
+    """Progress reporter handed to a job handler.
+    
+    Each call records progress, and optionally a partial result, together with a heartbeat,
+    then raises JobCancelled if a cancel has been requested. It writes on a connection of its
+    own, so handlers call it between their write transactions, never inside one.
+    """
+    def __init__(self, job_id):
+        self.job_id = job_id
+    
+    def __call__(self, done, total=None, result=None):
+        values = {'progress': done, 'heartbeat_at': datetime.utcnow()}
+        if total is not None:
+            values['total'] = total
+        if result is not None:
+            values['result'] = json.dumps(result)
+        table = BackgroundJob.__table__
+        with db.engine.begin() as connection:
+            cancel_requested = connection.execute(
+                table.update().where(table.c.id == self.job_id).values(**values).returning(table.c.cancel_requested)
+            ).scalar()
+        if cancel_requested:
+            raise JobCancelled()
+
+def job_file_path(job_id, extension):
+    directory = os.path.join(app.instance_path, 'jobs')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{job_id}.{extension}')
+
+def import_job_result(imported, errors):
+    return {'imported': imported, 'error_count': len(errors), 'errors': errors[:JOB_REPORTED_ERRORS]}
+
+def run_import_job(job_id, params, progress):
+    """Import the upload saved for the job; progress is in bytes of the file read."""
+    path = job_file_path(job_id, 'upload')
+    size = os.path.getsize(path)
+    try:
+        with open(path, 'rb') as upload:
+            stream = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+            result = import_employees(stream, params['format'], params['chunk_size'],
+                                      lambda imported, errors: progress(upload.tell(), size, import_job_result(imported, errors)))
+    finally:
+        os.remove(path)
+    return import_job_result(result['imported'], result['errors'])
+
+def run_export_job(job_id, params, progress):
+    """Write an export to a file kept for download; progress is in bytes written."""
+    query = filtered_employee_query(params.get('department'),
+                                    date.fromisoformat(params['hired_from']) if params.get('hired_from') else None,
+                                    date.fromisoformat(params['hired_to']) if params.get('hired_to') else None)
+    written = 0
+    with open(job_file_path(job_id, EXPORT_EXTENSIONS[params['format']]), 'wb') as output:
+        for count, chunk in enumerate(EXPORTERS[params['format']](query), start=1):
+            data = chunk.encode() if isinstance(chunk, str) else chunk
+            output.write(data)
+            written += len(data)
+            if count % JOB_PROGRESS_EVERY == 0:
+                progress(written)
+    progress(written, written)
+    return {'filename': f'employees.{EXPORT_EXTENSIONS[params["format"]]}', 'bytes': written}
+
+def run_reassign_job(job_id, params, progress):
+    """Move every employee of one department to another, one batch per transaction; progress is in employees."""
+    source = params['department']
+    total = db.session.query(func.count(Employee.id)).filter(Employee.department == source).scalar()
+    moved = 0
+    while True:
+        # Moved employees leave the source department, so each batch is the first remaining one
+        employees = Employee.query.filter_by(department=source).order_by(Employee.id).limit(REASSIGN_BATCH_SIZE).all()
+        if not employees:
+            break
+        for employee in employees:
+            employee.department = params['target']
+        db.session.commit()
+        moved += len(employees)
+        progress(moved, max(total, moved), {'moved': moved})
+    return {'moved': moved}
+
+def rebuild_search_index():
+    db.session.execute(db.text("INSERT INTO employee_fts(employee_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+def analyze_database():
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+REINDEX_STEPS = [('search index', rebuild_search_index), ('department headcounts', rebuild_department_headcounts),
+                 ('query planner statistics', analyze_database)]
+
+def run_reindex_job(job_id, params, progress):
+    """Rebuild the derived indexes and statistics; progress is in steps."""
+    for done, (name, step) in enumerate(REINDEX_STEPS):
+        progress(done, len(REINDEX_STEPS), {'step': name})
+        step()
+    return {'steps': [name for name, _ in REINDEX_STEPS]}
+
+# kind: (title, progress unit, handler)
+JOB_KINDS = {
+    'import': ('Import employees', 'bytes', run_import_job),
+    'export': ('Export employees', 'bytes', run_export_job),
+    'reassign': ('Reassign department', 'employees', run_reassign_job),
+    'reindex': ('Rebuild indexes', 'steps', run_reindex_job),
+}
+
+def queue_job(kind, params, upload=None):
+    """Record a queued job and hand it to this process's pool; return the job."""
+    job = BackgroundJob(kind=kind, params=json.dumps(params), created_by=session.get('username'))
+    db.session.add(job)
+    db.session.commit()
+    if upload is not None:
+        # The request body is gone once the response is sent; the job reads its own copy
+        upload.save(job_file_path(job.id, 'upload'))
+    app.extensions['jobs'].submit(run_job, job.id)
+    return job
+
+def run_job(job_id):
+    """Claim a queued job and run its handler; a job claimed or cancelled meanwhile is left alone."""
+    with app.app_context():
+        now = datetime.utcnow()
+        claimed = db.session.execute(db.update(BackgroundJob).where(
+            BackgroundJob.id == job_id, BackgroundJob.status == 'queued'
+        ).values(status='running', started_at=now, heartbeat_at=now)).rowcount
+        db.session.commit()
+        if not claimed:
+            return
+    
+        job = db.session.get(BackgroundJob, job_id)
+        handler, params = JOB_KINDS[job.kind][2], json.loads(job.params)
+        try:
+            result = handler(job_id, params, JobProgress(job_id))
+            values = {'status': 'succeeded', 'result': json.dumps(result),
+                      'progress': func.coalesce(BackgroundJob.total, BackgroundJob.progress)}
+        except JobCancelled:
+            # Work already committed stays; the last partial result says how far the job got
+            db.session.rollback()
+            values = {'status': 'cancelled'}
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception('Background job %s failed', job_id)
+            values = {'status': 'failed', 'error': f'{e.__class__.__name__}: {e}'}
+        db.session.execute(db.update(BackgroundJob).where(BackgroundJob.id == job_id).values(finished_at=datetime.utcnow(), **values))
+        db.session.commit()
+
+def cancel_job(job_id):
+    """Cancel a queued job outright, or ask a running one to stop at its next progress report."""
+    db.session.execute(db.update(BackgroundJob).where(
+        BackgroundJob.id == job_id, BackgroundJob.status.in_(JOB_ACTIVE_STATUSES)
+    ).values(
+        cancel_requested=True,
+        status=db.case((BackgroundJob.status == 'queued', 'cancelled'), else_=BackgroundJob.status),
+        finished_at=db.case((BackgroundJob.status == 'queued', datetime.utcnow()), else_=BackgroundJob.finished_at),
+    ))
+    db.session.commit()
+
+def recover_background_jobs():
+    """Fail running jobs that stopped reporting, requeue queued jobs nobody picked up and drop old job files."""
+    now = datetime.utcnow()
+    # The process running the job exited, or was restarted, without finishing it
+    db.session.execute(db.update(BackgroundJob).where(
+        BackgroundJob.status == 'running', BackgroundJob.heartbeat_at < now - timedelta(seconds=JOB_STALE_AFTER)
+    ).values(status='failed', error='interrupted: the process running the job stopped', finished_at=now))
+    db.session.commit()
+    
+    orphaned = db.session.query(BackgroundJob.id).filter(
+        BackgroundJob.status == 'queued', BackgroundJob.created_at < now - timedelta(seconds=JOB_RECOVERY_INTERVAL)
+    ).all()
+    for (job_id,) in orphaned:
+        app.extensions['jobs'].submit(run_job, job_id)
+    
+    directory = os.path.join(app.instance_path, 'jobs')
+    if os.path.isdir(directory):
+        cutoff = time.time() - JOB_FILE_RETENTION_DAYS * 86400
+        for entry in os.scandir(directory):
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+
+def run_scheduled_job_recovery():
+    with app.app_context():
+        if claim_job_run(JOB_RECOVERY_JOB, JOB_RECOVERY_INTERVAL):
+            recover_background_jobs()
+
+def job_dict(job):
+    title, unit, _ = JOB_KINDS[job.kind]
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'title': title,
+        'params': json.loads(job.params),
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'unit': unit,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'cancel_requested': job.cancel_requested,
+        'created_by': job.created_by,
+        'created_at': _export_value(job.created_at),
+        'started_at': _export_value(job.started_at),
+        'finished_at': _export_value(job.finished_at),
+    }
+
+# Full employee profile (employee + educations + certifications) loading and serialization
+PROFILE_LOAD_OPTIONS = [db.selectinload(Employee.educations), db.selectinload(Employee.certifications)]
+API_MAX_BATCH_SIZE = 500
+
+def employee_profile_dict(employee):
+    """Serialize an employee with its educations and certifications."""
+    record = _export_record(employee, EXPORT_EMPLOYEE_COLUMNS)
+    record['educations'] = [_export_record(row, EXPORT_EDUCATION_COLUMNS) for row in employee.educations]
+    record['certifications'] = [_export_record(row, EXPORT_CERTIFICATION_COLUMNS) for row in employee.certifications]
+    return record
+
+# Versioned JSON API (/api/v1): sparse fieldsets selected in SQL, id cursors, batched includes
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+class ApiResource:
+    """A model exposed under /api/v1.
+
+    `includes` maps an include name to (resource name, key field, many): with many=True the
+    related rows carry `key` pointing at this resource's id, otherwise this resource's `key`
+    points at the related row's id.
+    """
+    def __init__(self, model, fields, filters=(), includes=None):
+        self.model = model
+        self.fields = fields
+        self.filters = filters
+        self.includes = includes or {}
+
+API_RESOURCES = {
+    'employees': ApiResource(
+        Employee,
+        ['id', 'employee_id', 'first_name', 'last_name', 'email', 'phone', 'department', 'department_id', 'position',
+         'hire_date', 'current_address', 'permanent_address', 'salary', 'notes', 'created_at', 'updated_at', 'version'],
+        filters=['department', 'department_id', 'position'],
+        includes={'educations': ('educations', 'employee_id', True),
+                  'certifications': ('certifications', 'employee_id', True),
+                  'department': ('departments', 'department_id', False)}
+    ),
+    'departments': ApiResource(Department, ['id', 'name', 'headcount', 'created_at'], filters=['name']),
+    'educations': ApiResource(
+        Education,
+        ['id', 'employee_id', 'institution', 'degree', 'field_of_study', 'start_date', 'end_date', 'description', 'created_at'],
+        filters=['employee_id', 'institution', 'degree'],
+        includes={'employee': ('employees', 'employee_id', False)}
+    ),
+    'certifications': ApiResource(
+        Certification,
+        ['id', 'employee_id', 'name', 'issuing_organization', 'issue_date', 'expiry_date', 'credential_id', 'credential_url', 'created_at'],
+        filters=['employee_id', 'name', 'issuing_organization'],
+        includes={'employee': ('employees', 'employee_id', False)}
+    ),
+}
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def api_response(payload, status=200):
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(',', ':'), default=lambda value: value.isoformat())
+    return app.response_class(body, status=status, mimetype='application/json')
+
+def api_list_param(args, name, allowed):
+    """Parse a comma-separated parameter, rejecting names outside `allowed`."""
+    values = [value.strip() for value in args.get(name, '').split(',') if value.strip()]
+    unknown = [value for value in values if value not in allowed]
+    if unknown:
+        raise ApiError(f"unknown {name.split('[')[0]}: {', '.join(unknown)}")
+    return values
+
+def api_fields(resource, args, param):
+    return api_list_param(args, param, resource.fields) or resource.fields
+
+def api_filter_criteria(resource, args):
+    criteria = []
+    for name in resource.filters:
+        if name in args:
+            column = getattr(resource.model, name)
+            try:
+                criteria.append(column == column.type.python_type(args[name]))
+            except ValueError:
+                raise ApiError(f'invalid value for {name}')
+    return criteria
+
+def api_select(resource, fields, criteria, limit=None):
+    """SELECT only `fields` (plus id) of the resource; returns a list of dicts ordered by id."""
+    model = resource.model
+    columns = [model.id] + [getattr(model, field) for field in fields if field != 'id']
+    query = db.select(*columns).where(*criteria).order_by(model.id)
+    if limit:
+        query = query.limit(limit)
+    return [row._asdict() for row in db.session.execute(query)]
+
+def api_load(resource, args, criteria, limit=None):
+    """Load records with the requested fieldset and attach the requested includes, one query each."""
+    fields = api_fields(resource, args, 'fields')
+    includes = api_list_param(args, 'include', resource.includes)
+    # Keys needed to resolve includes are selected even when not requested, then dropped
+    keys = {resource.includes[name][1] for name in includes if not resource.includes[name][2]}
+    records = api_select(resource, fields + sorted(keys - set(fields)), criteria, limit)
+
+    for name in includes:
+        target_name, key, many = resource.includes[name]
+        target = API_RESOURCES[target_name]
+        target_fields = api_fields(target, args, f'fields[{name}]')
+        if many:
+            ids = [record['id'] for record in records]
+            related = api_select(target, target_fields + ([key] if key not in target_fields else []),
+                                 [getattr(target.model, key).in_(ids)]) if ids else []
+            grouped = {}
+            for row in related:
+                owner = row[key] if key in target_fields else row.pop(key)
+                grouped.setdefault(owner, []).append(row)
+            for record in records:
+                record[name] = grouped.get(record['id'], [])
+        else:
+            ids = {record[key] for record in records if record[key] is not None}
+            related = {row['id']: row for row in api_select(target, target_fields, [target.model.id.in_(ids)])} if ids else {}
+            for record in records:
+                record[name] = related.get(record[key])
+
+    for record in records:
+        for key in keys - set(fields):
+            del record[key]
+    return records
+
+def bootstrap_database():
+    """Create tables, apply pending migrations and create the default admin user.
+    
+    Run once per deployment (`flask --app app init-db`) before serving traffic;
+    it is safe to re-run and to run from several processes at once.
+    """
     db.create_all()
     
+    # Bring existing databases up to the current schema
+    run_migrations(db.engine.url.database)
+    
     # Create default admin user if it doesn't exist
     admin = User.query.filter_by(username='admin').first()
     if not admin:
         admin = User(username='admin', is_admin=True)
         admin.set_password('admin')
         db.session.add(admin)
-        db.session.commit()
-        print("Default admin user created")
+        try:
+            db.session.commit()
+            print("Default admin user created")
+        except IntegrityError:
+            # Another process created it first
+            db.session.rollback()
+
+def reset_after_fork():
+    """Drop the pooled connections a forked worker inherited; the parent process keeps using them."""
+    if 'sqlalchemy' not in app.extensions:
+        return  # not preloaded: the worker creates the app itself and inherits no connections
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+@app.cli.command('serve')
+@click.option('--bind', help='address to listen on (default 0.0.0.0:12000)')
+@click.option('--workers', type=int, help='worker processes (default 2 x CPU cores + 1)')
+@click.option('--threads', type=int, help='threads per worker (default 4)')
+@click.option('--preload/--no-preload', default=None, help='load the app once before forking workers (default on)')
+def serve_command(bind, workers, threads, preload):
+    """Serve the app with prefork gunicorn workers, configured by gunicorn.conf.py."""
+    if importlib.util.find_spec('gunicorn') is None:
+        raise click.ClickException('gunicorn is not installed (pip install -r requirements.txt)')
+    
+    argv = [sys.executable, '-m', 'gunicorn', '--config', os.path.join(app.root_path, 'gunicorn.conf.py'),
+            '--chdir', app.root_path]
+    if bind:
+        argv += ['--bind', bind]
+    if workers:
+        argv += ['--workers', str(workers)]
+    if threads:
+        argv += ['--threads', str(threads)]
+    if preload is not None:
+        # gunicorn has no flag to turn preload_app off, so gunicorn.conf.py reads it from the environment
+        os.environ['GUNICORN_PRELOAD'] = '1' if preload else '0'
+    # Replace this process, so the gunicorn master receives signals sent to it
+    os.execv(sys.executable, argv + ['app:create_app()'])
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create or upgrade the database schema and the default admin user."""
+    create_app()
+    bootstrap_database()
+    print("Database is ready.")
+
+@app.cli.command('compact-changes')
+@click.option('--days', type=int, default=CHANGE_LOG_RETENTION_DAYS, help='keep every entry from the last DAYS days')
+def compact_changes_command(days):
+    """Drop superseded change log entries older than the retention period."""
+    create_app()
+    deleted = compact_change_log(datetime.utcnow() - timedelta(days=days))
+    print(f"Removed {deleted} superseded change log entries.")
+
+@app.cli.command('scan-certifications')
+def scan_certifications_command():
+    """Queue alerts for certifications expiring soon, as the scheduler does every hour."""
+    create_app()
+    scanned = scan_certification_expiry()
+    print(f"Scanned {scanned} certifications expiring within {CERTIFICATION_EXPIRY_HORIZON_DAYS} days.")
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -169,35 +2040,38 @@ def index():
     # Check if user is admin
     if session.get('is_admin', False):
         # Admin dashboard
-        # Get all unique departments
-        departments = db.session.query(Employee.department).distinct().all()
-        departments = [dept[0] for dept in departments]
-        
-        # Count employees per department and total
-        department_counts = {}
-        total_employees = 0
-        
-        for dept in departments:
-            count = Employee.query.filter_by(department=dept).count()
-            department_counts[dept] = count
-            total_employees += count
+        # Read department headcounts from the materialized summary
+        department_counts = dict(get_department_headcounts())
+        departments = list(department_counts)
+        total_employees = sum(department_counts.values())
+        expiring_count, expiring = expiring_certifications(date.today())
         
         return render_template('index.html', 
                               departments=departments, 
                               department_counts=department_counts,
-                              total_employees=total_employees)
+                              total_employees=total_employees,
+                              expiring_count=expiring_count,
+                              expiring=expiring,
+                              expiry_horizon_days=CERTIFICATION_EXPIRY_HORIZON_DAYS)
     else:
         # Employee dashboard
         # Get the current user
-        user = User.query.filter_by(username=session.get('username')).first()
+        # Load the user together with the full employee profile
+        user = User.query.options(
+            db.joinedload(User.employee).selectinload(Employee.educations),
+            db.joinedload(User.employee).selectinload(Employee.certifications)
+        ).filter_by(username=session.get('username')).first()
         
         # Check if user has an employee profile
-        if user and user.employee_id:
-            employee = Employee.query.get(user.employee_id)
-            if employee:
-                educations = Education.query.filter_by(employee_id=employee.id).all()
-                certifications = Certification.query.filter_by(employee_id=employee.id).all()
-                return render_template('employee_dashboard.html', employee=employee, educations=educations, certifications=certifications)
+        if user and user.employee:
+            employee = user.employee
+            today = date.today()
+            horizon = today + timedelta(days=CERTIFICATION_EXPIRY_HORIZON_DAYS)
+            expiring = sorted((certification for certification in employee.certifications
+                               if certification.expiry_date and today <= certification.expiry_date <= horizon),
+                              key=lambda certification: certification.expiry_date)
+            return render_template('employee_dashboard.html', employee=employee, educations=employee.educations, certifications=employee.certifications,
+                                   expiring_certifications=expiring)
         
         # Redirect to self-onboarding if no profile exists
         flash('Please complete your profile information', 'info')
@@ -206,11 +2080,23 @@ def index():
 @app.route('/department/<department>')
 @login_required
 def department_employees(department):
-    employees = Employee.query.filter_by(department=department).all()
-    return render_template('department_employees.html', department=department, employees=employees)
+    etag = employee_list_etag(Employee.department == department)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    
+    query = Employee.query.options(db.load_only(*EMPLOYEE_LIST_COLUMNS)).filter_by(department=department)
+    total = db.session.query(Department.headcount).filter_by(name=department).scalar() or 0
+    
+    if request.args.get('stream'):
+        return set_validators(stream_employee_list('department_employees.html', query, department=department, total=total), etag)
+    
+    page = keyset_paginate(query, request.args)
+    return set_validators(app.make_response(render_template('department_employees.html', department=department, employees=page.items, total=total, page=page)), etag)
 
 @app.route('/add-department', methods=['GET', 'POST'])
 @admin_required
+@retry_on_busy
 def add_department():
     if request.method == 'POST':
         department_name = request.form.get('department_name')
@@ -220,29 +2106,11 @@ def add_department():
             return redirect(url_for('add_department'))
         
         # Check if department already exists
-        existing_departments = db.session.query(Employee.department).distinct().all()
-        existing_departments = [dept[0] for dept in existing_departments if dept[0]]
-        
-        if department_name in existing_departments:
+        if Department.query.filter_by(name=department_name).first():
             flash(f'Department "{department_name}" already exists', 'warning')
             return redirect(url_for('index'))
         
-        # Create a placeholder employee to establish the department
-        placeholder = Employee(
-            first_name="Department",
-            last_name="Placeholder",
-            email=f"{department_name.lower().replace(' ', '.')}@example.com",
-            phone="N/A",
-            department=department_name,
-            position="Department Head",
-            hire_date=datetime.utcnow(),
-            salary=0,
-            current_address="N/A",
-            permanent_address="N/A",
-            notes="This is a placeholder record to establish the department. You can delete this record after adding real employees to this department."
-        )
-        
-        db.session.add(placeholder)
+        db.session.add(Department(name=department_name))
         db.session.commit()
         
         flash(f'Department "{department_name}" has been added successfully', 'success')
@@ -253,36 +2121,30 @@ def add_department():
 @app.route('/search')
 @login_required
 def search_employees():
-    query = request.args.get('query', '')
-    if not query:
-        return redirect(url_for('index'))
-    
-    # Search by name or position
-    employees = Employee.query.filter(
-        db.or_(
-            Employee.first_name.ilike(f'%{query}%'),
-            Employee.last_name.ilike(f'%{query}%'),
-            Employee.position.ilike(f'%{query}%')
-        )
-    ).all()
-    
-    return render_template('search_results.html', employees=employees, query=query)
+    filters = search_filters(request.args)
+    today = date.today()
+    page, total, facets = search_employees_page(filters, request.args, today)
+    return render_template('search_results.html', employees=page.items, page=page, total=total, facets=facets,
+                           filters=filters, query=filters['query'], salary_bands=SALARY_BANDS,
+                           certification_statuses=CERTIFICATION_STATUSES)
 
 @app.route('/positions')
 @login_required
 def get_positions():
-    query = request.args.get('q', '')
-    positions = db.session.query(Employee.position).distinct().filter(
-        Employee.position.ilike(f'%{query}%')
-    ).all()
-    return jsonify([position[0] for position in positions])
+    # Served from the in-process index; no database round trip per keystroke
+    return autocomplete_response(position_index, request.args.get('q', ''))
+
+@app.route('/departments')
+@login_required
+def get_departments():
+    return autocomplete_response(department_index, request.args.get('q', ''))
 
 @app.route('/add', methods=['GET', 'POST'])
 @admin_required
+@retry_on_busy
 def add_employee():
     # Get all unique departments for the dropdown
-    departments = db.session.query(Employee.department).distinct().all()
-    departments = [dept[0] for dept in departments]
+    departments = get_department_names()
     
     # Add default departments if none exist
     if not departments:
@@ -293,7 +2155,8 @@ def add_employee():
         ]
     
     if request.method == 'POST':
-        employee_id = request.form.get('employee_id', '')
+        # Blank IDs are stored as NULL so they never collide on the unique constraint
+        employee_id = request.form.get('employee_id') or None
         first_name = request.form['first_name']
         last_name = request.form['last_name']
         email = request.form['email']
@@ -344,85 +2207,265 @@ def add_employee():
             notes=notes
         )
         
-        # Add to database
-        db.session.add(new_employee)
-        db.session.commit()
-        
-        # Process education information if provided
-        education_count = int(request.form.get('education_count', 0))
-        for i in range(education_count):
-            if request.form.get(f'institution_{i}'):
-                institution = request.form.get(f'institution_{i}')
-                degree = request.form.get(f'degree_{i}')
-                field_of_study = request.form.get(f'field_of_study_{i}')
-                start_date_str = request.form.get(f'edu_start_date_{i}')
-                end_date_str = request.form.get(f'edu_end_date_{i}')
-                description = request.form.get(f'edu_description_{i}', '')
-                
-                # Convert string dates to datetime objects
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
-                
-                education = Education(
-                    employee_id=new_employee.id,
-                    institution=institution,
-                    degree=degree,
-                    field_of_study=field_of_study,
-                    start_date=start_date,
-                    end_date=end_date,
-                    description=description
-                )
-                db.session.add(education)
-        
-        # Process certification information if provided
-        cert_count = int(request.form.get('certification_count', 0))
-        for i in range(cert_count):
-            if request.form.get(f'cert_name_{i}'):
-                name = request.form.get(f'cert_name_{i}')
-                issuing_organization = request.form.get(f'issuing_organization_{i}')
-                issue_date_str = request.form.get(f'issue_date_{i}')
-                expiry_date_str = request.form.get(f'expiry_date_{i}')
-                credential_id = request.form.get(f'credential_id_{i}', '')
-                credential_url = request.form.get(f'credential_url_{i}', '')
-                
-                # Convert string dates to datetime objects
-                issue_date = datetime.strptime(issue_date_str, '%Y-%m-%d').date() if issue_date_str else None
-                expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d').date() if expiry_date_str else None
-                
-                certification = Certification(
-                    employee_id=new_employee.id,
-                    name=name,
-                    issuing_organization=issuing_organization,
-                    issue_date=issue_date,
-                    expiry_date=expiry_date,
-                    credential_id=credential_id,
-                    credential_url=credential_url
-                )
-                db.session.add(certification)
-        
-        db.session.commit()
+        # Employee and education/certification rows are written in a single transaction
+        try:
+            create_employee_profile(new_employee, parse_education_rows(request.form), parse_certification_rows(request.form))
+        except IntegrityError:
+            flash('Email or Employee ID already exists!', 'danger')
+            return redirect(url_for('add_employee'))
         
         flash('Employee added successfully!', 'success')
         return redirect(url_for('index'))
     
     return render_template('add_employee.html', departments=departments)
 
+@app.route('/import', methods=['GET', 'POST'])
+@admin_required
+@retry_on_busy
+def import_employees_upload():
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or NDJSON file to import', 'danger')
+            return redirect(url_for('import_employees_upload'))
+        
+        fmt = request.form.get('format') or import_format_for(upload.filename)
+        if fmt not in IMPORT_FORMATS:
+            fmt = import_format_for(upload.filename)
+        try:
+            chunk_size = max(int(request.form.get('chunk_size', IMPORT_CHUNK_SIZE)), 1)
+        except ValueError:
+            chunk_size = IMPORT_CHUNK_SIZE
+        
+        # The import runs as a background job; this page follows its progress
+        job = queue_job('import', {'filename': upload.filename, 'format': fmt, 'chunk_size': chunk_size}, upload)
+        return redirect(url_for('import_employees_upload', job=job.id))
+    
+    job = None
+    if request.args.get('job', '').isdigit():
+        job = db.session.get(BackgroundJob, int(request.args['job']))
+        if job is None or job.kind != 'import':
+            abort(404)
+        job = job_dict(job)
+    return render_template('import_employees.html', job=job, result=job and job['result'])
+
+@app.route('/export/<fmt>', methods=['GET', 'POST'])
+@admin_required
+@retry_on_busy
+def export_employees(fmt):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    # GET streams the export in the response; POST writes it to a file in a background job
+    args = request.form if request.method == 'POST' else request.args
+    try:
+        hired_from = date.fromisoformat(args['hired_from']) if args.get('hired_from') else None
+        hired_to = date.fromisoformat(args['hired_to']) if args.get('hired_to') else None
+    except ValueError:
+        abort(400)
+    
+    if request.method == 'POST':
+        job = queue_job('export', {'format': fmt, 'department': args.get('department') or None,
+                                   'hired_from': args.get('hired_from') or None, 'hired_to': args.get('hired_to') or None})
+        flash(f'Export queued as job #{job.id}', 'info')
+        return redirect(url_for('job_list'))
+    
+    query = filtered_employee_query(args.get('department'), hired_from, hired_to)
+    response = app.response_class(stream_with_context(EXPORTERS[fmt](query)), mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=employees.{EXPORT_EXTENSIONS[fmt]}'
+    return response
+
+@app.route('/jobs')
+@admin_required
+def job_list():
+    jobs = BackgroundJob.query.order_by(BackgroundJob.id.desc()).limit(JOB_LIST_LIMIT).all()
+    return render_template('jobs.html', jobs=[job_dict(job) for job in jobs], departments=get_department_names(),
+                           export_formats=EXPORT_FORMATS)
+
+@app.route('/api/jobs/<int:id>')
+@admin_required
+def api_job(id):
+    job = db.session.get(BackgroundJob, id)
+    if job is None:
+        abort(404)
+    return jsonify(job_dict(job))
+
+@app.route('/jobs/<int:id>/cancel', methods=['POST'])
+@admin_required
+@retry_on_busy
+def cancel_background_job(id):
+    cancel_job(id)
+    flash(f'Cancellation of job #{id} requested', 'info')
+    return redirect(url_for('job_list'))
+
+@app.route('/jobs/<int:id>/download')
+@admin_required
+def download_job_result(id):
+    job = db.session.get(BackgroundJob, id)
+    if job is None or job.kind != 'export' or job.status != 'succeeded':
+        abort(404)
+    fmt = json.loads(job.params)['format']
+    path = job_file_path(id, EXPORT_EXTENSIONS[fmt])
+    if not os.path.exists(path):
+        abort(404)
+    return send_file(path, mimetype=EXPORT_MIMETYPES[fmt], as_attachment=True, download_name=f'employees.{EXPORT_EXTENSIONS[fmt]}')
+
+@app.route('/jobs/reassign', methods=['POST'])
+@admin_required
+@retry_on_busy
+def reassign_department():
+    department, target = request.form.get('department'), request.form.get('target')
+    departments = get_department_names()
+    if department not in departments or target not in departments or department == target:
+        flash('Choose two different existing departments', 'danger')
+        return redirect(url_for('job_list'))
+    job = queue_job('reassign', {'department': department, 'target': target})
+    flash(f'Moving {department} employees to {target} as job #{job.id}', 'info')
+    return redirect(url_for('job_list'))
+
+@app.route('/jobs/reindex', methods=['POST'])
+@admin_required
+@retry_on_busy
+def reindex():
+    job = queue_job('reindex', {})
+    flash(f'Index rebuild queued as job #{job.id}', 'info')
+    return redirect(url_for('job_list'))
+
 @app.route('/employee/<int:id>')
 @login_required
 def employee_details(id):
-    employee = Employee.query.get_or_404(id)
-    educations = Education.query.filter_by(employee_id=id).all()
-    certifications = Certification.query.filter_by(employee_id=id).all()
-    return render_template('employee_details.html', employee=employee, educations=educations, certifications=certifications)
+    validators = db.session.query(Employee.version, Employee.updated_at).filter_by(id=id).first()
+    if validators is None:
+        abort(404)
+    etag = page_etag(id, validators.version)
+    not_modified = not_modified_response(etag, validators.updated_at)
+    if not_modified:
+        return not_modified
+    
+    employee = Employee.query.options(*PROFILE_LOAD_OPTIONS).get_or_404(id)
+    response = app.make_response(render_template('employee_details.html', employee=employee, educations=employee.educations, certifications=employee.certifications))
+    return set_validators(response, etag, validators.updated_at)
+
+@app.route('/api/employees')
+@login_required
+def api_employees():
+    # Batch lookup of full profiles: one employee query plus one IN query per relationship
+    try:
+        ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+    if len(ids) > API_MAX_BATCH_SIZE:
+        return jsonify({'error': f'at most {API_MAX_BATCH_SIZE} ids per request'}), 400
+    
+    employees = {employee.id: employee for employee in
+                 Employee.query.options(*PROFILE_LOAD_OPTIONS).filter(Employee.id.in_(ids)).all()} if ids else {}
+    return jsonify({
+        'employees': [employee_profile_dict(employees[id]) for id in dict.fromkeys(ids) if id in employees],
+        'missing': [id for id in dict.fromkeys(ids) if id not in employees]
+    })
+
+@app.errorhandler(ApiError)
+def api_error(error):
+    return api_response({'error': error.message}, error.status)
+
+@app.route('/api/v1/<resource_name>')
+@login_required
+def api_v1_list(resource_name):
+    resource = API_RESOURCES.get(resource_name)
+    if resource is None:
+        raise ApiError(f'unknown resource: {resource_name}', 404)
+    try:
+        limit = min(max(int(request.args.get('limit', API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    
+    criteria = api_filter_criteria(resource, request.args)
+    if request.args.get('after'):
+        try:
+            _, last_id = decode_cursor(request.args['after'], 'id')
+        except ValueError:
+            raise ApiError('after must be a cursor returned in next')
+        criteria.append(resource.model.id > last_id)
+    
+    # One extra row tells whether there is a next page
+    records = api_load(resource, request.args, criteria, limit + 1)
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(None, records[-1]['id'])
+    return api_response({'data': records, 'next': next_cursor})
+
+@app.route('/api/v1/<resource_name>/<int:id>')
+@login_required
+def api_v1_detail(resource_name, id):
+    resource = API_RESOURCES.get(resource_name)
+    if resource is None:
+        raise ApiError(f'unknown resource: {resource_name}', 404)
+    records = api_load(resource, request.args, [resource.model.id == id], 1)
+    if not records:
+        raise ApiError(f'{resource_name} {id} not found', 404)
+    return api_response({'data': records[0]})
+
+@app.route('/changes')
+@login_required
+def change_feed():
+    """Change log entries after `since`, oldest first, each with its entity's current record."""
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(max(int(request.args.get('limit', API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError('since and limit must be integers')
+    
+    entries = db.session.execute(
+        db.select(ChangeLogEntry.seq, ChangeLogEntry.entity, ChangeLogEntry.entity_id, ChangeLogEntry.op, ChangeLogEntry.changed_at)
+        .where(ChangeLogEntry.seq > since).order_by(ChangeLogEntry.seq).limit(limit + 1)
+    ).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    
+    # Current records with the requested fieldsets, one query per entity type
+    records = {}
+    for entity in {entry.entity for entry in entries}:
+        resource = API_RESOURCES[entity]
+        ids = {entry.entity_id for entry in entries if entry.entity == entity}
+        fields = api_fields(resource, request.args, f'fields[{entity}]')
+        records[entity] = {row['id']: row for row in api_select(resource, fields, [resource.model.id.in_(ids)])}
+    
+    return api_response({
+        'changes': [{'seq': entry.seq, 'entity': entry.entity, 'id': entry.entity_id, 'op': entry.op,
+                     'changed_at': entry.changed_at, 'data': records[entry.entity].get(entry.entity_id)}
+                    for entry in entries],
+        'next': entries[-1].seq if entries else since,
+        'has_more': has_more
+    })
+
+@app.route('/analytics')
+@admin_required
+def analytics_dashboard():
+    version, stats = get_department_analytics()
+    etag = page_etag('analytics', *version)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    return set_validators(app.make_response(render_template('analytics.html', stats=stats, salary_bucket_width=SALARY_BUCKET_WIDTH)), etag)
+
+@app.route('/api/analytics')
+@admin_required
+def api_analytics():
+    version, stats = get_department_analytics()
+    etag = page_etag('api_analytics', *version)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    return set_validators(api_response(stats), etag)
 
 @app.route('/employee/<int:id>/edit', methods=['GET', 'POST'])
 @admin_required
+@retry_on_busy
 def edit_employee(id):
-    employee = Employee.query.get_or_404(id)
+    employee = Employee.query.options(*PROFILE_LOAD_OPTIONS).get_or_404(id)
     
     # Get all unique departments for the dropdown
-    departments = db.session.query(Employee.department).distinct().all()
-    departments = [dept[0] for dept in departments]
+    departments = get_department_names()
     
     if request.method == 'POST':
         # Check if employee_id is being changed and if it already exists
@@ -454,76 +2497,19 @@ def edit_employee(id):
         except ValueError:
             employee.salary = 0
         
-        # Update education information
-        # First, remove all existing education records for this employee
-        Education.query.filter_by(employee_id=employee.id).delete()
-        
-        # Then add the new education records
-        education_count = int(request.form.get('education_count', 0))
-        for i in range(education_count):
-            if request.form.get(f'institution_{i}'):
-                institution = request.form.get(f'institution_{i}')
-                degree = request.form.get(f'degree_{i}')
-                field_of_study = request.form.get(f'field_of_study_{i}')
-                start_date_str = request.form.get(f'edu_start_date_{i}')
-                end_date_str = request.form.get(f'edu_end_date_{i}')
-                description = request.form.get(f'edu_description_{i}', '')
-                
-                # Convert string dates to datetime objects
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
-                
-                education = Education(
-                    employee_id=employee.id,
-                    institution=institution,
-                    degree=degree,
-                    field_of_study=field_of_study,
-                    start_date=start_date,
-                    end_date=end_date,
-                    description=description
-                )
-                db.session.add(education)
-        
-        # Update certification information
-        # First, remove all existing certification records for this employee
-        Certification.query.filter_by(employee_id=employee.id).delete()
-        
-        # Then add the new certification records
-        cert_count = int(request.form.get('certification_count', 0))
-        for i in range(cert_count):
-            if request.form.get(f'cert_name_{i}'):
-                name = request.form.get(f'cert_name_{i}')
-                issuing_organization = request.form.get(f'issuing_organization_{i}')
-                issue_date_str = request.form.get(f'issue_date_{i}')
-                expiry_date_str = request.form.get(f'expiry_date_{i}')
-                credential_id = request.form.get(f'credential_id_{i}', '')
-                credential_url = request.form.get(f'credential_url_{i}', '')
-                
-                # Convert string dates to datetime objects
-                issue_date = datetime.strptime(issue_date_str, '%Y-%m-%d').date() if issue_date_str else None
-                expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d').date() if expiry_date_str else None
-                
-                certification = Certification(
-                    employee_id=employee.id,
-                    name=name,
-                    issuing_organization=issuing_organization,
-                    issue_date=issue_date,
-                    expiry_date=expiry_date,
-                    credential_id=credential_id,
-                    credential_url=credential_url
-                )
-                db.session.add(certification)
+        # Write only the education/certification rows that actually changed
+        reconcile_employee_rows(Education, employee.id, parse_education_rows(request.form))
+        reconcile_employee_rows(Certification, employee.id, parse_certification_rows(request.form))
         
         db.session.commit()
         flash('Employee updated successfully!', 'success')
         return redirect(url_for('employee_details', id=employee.id))
     
-    educations = Education.query.filter_by(employee_id=id).all()
-    certifications = Certification.query.filter_by(employee_id=id).all()
-    return render_template('edit_employee.html', employee=employee, departments=departments, educations=educations, certifications=certifications)
+    return render_template('edit_employee.html', employee=employee, departments=departments, educations=employee.educations, certifications=employee.certifications)
 
 @app.route('/employee/<int:id>/delete', methods=['POST'])
 @admin_required
+@retry_on_busy
 def delete_employee(id):
     employee = Employee.query.get_or_404(id)
     db.session.delete(employee)
@@ -534,11 +2520,43 @@ def delete_employee(id):
 @app.route('/all-employees')
 @login_required
 def all_employees():
-    employees = Employee.query.all()
-    return render_template('all_employees.html', employees=employees)
+    etag = employee_list_etag()
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    
+    query = Employee.query.options(db.load_only(*EMPLOYEE_LIST_COLUMNS))
+    total = db.session.query(func.coalesce(func.sum(Department.headcount), 0)).scalar()
+    
+    if request.args.get('stream'):
+        return set_validators(stream_employee_list('all_employees.html', query, total=total), etag)
+    
+    page = keyset_paginate(query, request.args)
+    return set_validators(app.make_response(render_template('all_employees.html', employees=page.items, total=total, page=page)), etag)
+
+@app.route('/employee-rows')
+@login_required
+def employee_table_rows():
+    """Compact JSON rows for the virtualized employee tables, paged like the listings."""
+    department = request.args.get('department')
+    criteria = [Employee.department == department] if department else []
+    etag = employee_list_etag(*criteria)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    
+    # Plain row tuples; no ORM entities are built for these
+    page = keyset_paginate(db.session.query(*EMPLOYEE_LIST_COLUMNS).filter(*criteria), request.args)
+    body = json.dumps({
+        'rows': [[row.id, row.first_name, row.last_name, row.email, row.department, row.position, row.hire_date.isoformat()]
+                 for row in page.items],
+        'next': page.next_cursor
+    }, separators=(',', ':'))
+    return set_validators(app.response_class(body, mimetype='application/json'), etag)
 
 @app.route('/self-onboarding', methods=['GET', 'POST'])
 @login_required
+@retry_on_busy
 def self_onboarding():
     # Check if user is an employee (not admin)
     if session.get('is_admin', False):
@@ -554,13 +2572,12 @@ def self_onboarding():
     
     # Check if user already has an employee profile
     if user.employee_id:
-        employee = Employee.query.get(user.employee_id)
-        educations = Education.query.filter_by(employee_id=employee.id).all()
-        certifications = Certification.query.filter_by(employee_id=employee.id).all()
+        employee = Employee.query.options(*PROFILE_LOAD_OPTIONS).get(user.employee_id)
+        educations = employee.educations
+        certifications = employee.certifications
         
         # Get all unique departments for the dropdown
-        departments = db.session.query(Employee.department).distinct().all()
-        departments = [dept[0] for dept in departments]
+        departments = get_department_names()
         
         if request.method == 'POST':
             # Update employee information
@@ -572,65 +2589,9 @@ def self_onboarding():
             employee.current_address = request.form['current_address']
             employee.permanent_address = request.form.get('permanent_address', '')
             
-            # Update education information
-            # First, remove all existing education records for this employee
-            Education.query.filter_by(employee_id=employee.id).delete()
-            
-            # Then add the new education records
-            education_count = int(request.form.get('education_count', 0))
-            for i in range(education_count):
-                if request.form.get(f'institution_{i}'):
-                    institution = request.form.get(f'institution_{i}')
-                    degree = request.form.get(f'degree_{i}')
-                    field_of_study = request.form.get(f'field_of_study_{i}')
-                    start_date_str = request.form.get(f'edu_start_date_{i}')
-                    end_date_str = request.form.get(f'edu_end_date_{i}')
-                    description = request.form.get(f'edu_description_{i}', '')
-                    
-                    # Convert string dates to datetime objects
-                    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
-                    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
-                    
-                    education = Education(
-                        employee_id=employee.id,
-                        institution=institution,
-                        degree=degree,
-                        field_of_study=field_of_study,
-                        start_date=start_date,
-                        end_date=end_date,
-                        description=description
-                    )
-                    db.session.add(education)
-            
-            # Update certification information
-            # First, remove all existing certification records for this employee
-            Certification.query.filter_by(employee_id=employee.id).delete()
-            
-            # Then add the new certification records
-            cert_count = int(request.form.get('certification_count', 0))
-            for i in range(cert_count):
-                if request.form.get(f'cert_name_{i}'):
-                    name = request.form.get(f'cert_name_{i}')
-                    issuing_organization = request.form.get(f'issuing_organization_{i}')
-                    issue_date_str = request.form.get(f'issue_date_{i}')
-                    expiry_date_str = request.form.get(f'expiry_date_{i}')
-                    credential_id = request.form.get(f'credential_id_{i}', '')
-                    credential_url = request.form.get(f'credential_url_{i}', '')
-                    
-                    # Convert string dates to datetime objects
-                    issue_date = datetime.strptime(issue_date_str, '%Y-%m-%d').date() if issue_date_str else None
-                    expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d').date() if expiry_date_str else None
-                    
-                    certification = Certification(
-                        employee_id=employee.id,
-                        name=name,
-                        issuing_organization=issuing_organization,
-                        issue_date=issue_date,
-                        expiry_date=expiry_date,
-                        credential_id=credential_id,
-                        credential_url=credential_url
-                    )
-                    db.session.add(certification)
+            # Write only the education/certification rows that actually changed
+            reconcile_employee_rows(Education, employee.id, parse_education_rows(request.form))
+            reconcile_employee_rows(Certification, employee.id, parse_certification_rows(request.form))
             
             db.session.commit()
             flash('Your profile has been updated successfully!', 'success')
@@ -642,7 +2603,7 @@ def self_onboarding():
         if request.method == 'POST':
             # Create new employee
             new_employee = Employee(
-                employee_id=request.form.get('employee_id', ''),
+                employee_id=request.form.get('employee_id') or None,
                 first_name=request.form['first_name'],
                 last_name=request.form['last_name'],
                 email=request.form['email'],
@@ -656,78 +2617,23 @@ def self_onboarding():
                 notes=''
             )
             
-            # Add to database
-            db.session.add(new_employee)
-            db.session.commit()
-            
-            # Link employee to user
-            user.employee_id = new_employee.id
-            db.session.commit()
-            
-            # Process education information if provided
-            education_count = int(request.form.get('education_count', 0))
-            for i in range(education_count):
-                if request.form.get(f'institution_{i}'):
-                    institution = request.form.get(f'institution_{i}')
-                    degree = request.form.get(f'degree_{i}')
-                    field_of_study = request.form.get(f'field_of_study_{i}')
-                    start_date_str = request.form.get(f'edu_start_date_{i}')
-                    end_date_str = request.form.get(f'edu_end_date_{i}')
-                    description = request.form.get(f'edu_description_{i}', '')
-                    
-                    # Convert string dates to datetime objects
-                    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
-                    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
-                    
-                    education = Education(
-                        employee_id=new_employee.id,
-                        institution=institution,
-                        degree=degree,
-                        field_of_study=field_of_study,
-                        start_date=start_date,
-                        end_date=end_date,
-                        description=description
-                    )
-                    db.session.add(education)
-            
-            # Process certification information if provided
-            cert_count = int(request.form.get('certification_count', 0))
-            for i in range(cert_count):
-                if request.form.get(f'cert_name_{i}'):
-                    name = request.form.get(f'cert_name_{i}')
-                    issuing_organization = request.form.get(f'issuing_organization_{i}')
-                    issue_date_str = request.form.get(f'issue_date_{i}')
-                    expiry_date_str = request.form.get(f'expiry_date_{i}')
-                    credential_id = request.form.get(f'credential_id_{i}', '')
-                    credential_url = request.form.get(f'credential_url_{i}', '')
-                    
-                    # Convert string dates to datetime objects
-                    issue_date = datetime.strptime(issue_date_str, '%Y-%m-%d').date() if issue_date_str else None
-                    expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d').date() if expiry_date_str else None
-                    
-                    certification = Certification(
-                        employee_id=new_employee.id,
-                        name=name,
-                        issuing_organization=issuing_organization,
-                        issue_date=issue_date,
-                        expiry_date=expiry_date,
-                        credential_id=credential_id,
-                        credential_url=credential_url
-                    )
-                    db.session.add(certification)
-            
-            db.session.commit()
+            # Employee, education/certification rows and the user link are committed together
+            try:
+                create_employee_profile(new_employee, parse_education_rows(request.form), parse_certification_rows(request.form), user)
+            except IntegrityError:
+                flash('Email or Employee ID already exists!', 'danger')
+                return redirect(url_for('self_onboarding'))
             
             flash('Your profile has been created successfully!', 'success')
             return redirect(url_for('self_onboarding'))
         
         # Get all unique departments for the dropdown
-        departments = db.session.query(Employee.department).distinct().all()
-        departments = [dept[0] for dept in departments]
+        departments = get_department_names()
         
         return render_template('self_onboarding.html', employee=None, departments=departments, educations=[], certifications=[])
 
 @app.route('/register', methods=['GET', 'POST'])
+@retry_on_busy
 def register():
     # If user is already logged in, redirect to index
     if 'logged_in' in session:
@@ -761,4 +2667,10 @@ def register():
     return render_template('register.html')
 
 if __name__ == '__main__':
+    create_app()
+    with app.app_context():
+        bootstrap_database()
+    # The debug reloader serves from a child process; the watching parent runs no jobs
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_scheduler()
     app.run(host='0.0.0.0', port=12000, debug=True)
\ No newline at end of file
@@ -0,0 +1,383 @@
+"""Route-level benchmark for app.py.
+
+Drives every route through the Flask test client (latency, SQL statements per request
+and peak Python memory per request) or, with --http, through a local threaded HTTP
+server with concurrent clients. Results can be saved as a baseline and later runs
+fail (exit status 1) when a route regresses past the tolerance. --sqlite-contention runs
+reader and writer processes against the database file, once with the old SQLite settings
+and once with the engine profile from app.py.
+
+    python seed_data.py --employees 50000 --database sqlite:////tmp/bench.db
+    python benchmark.py --database sqlite:////tmp/bench.db --save-baseline bench_baseline.json
+    python benchmark.py --database sqlite:////tmp/bench.db --baseline bench_baseline.json
+    python benchmark.py --database sqlite:////tmp/bench.db --sqlite-contention --readers 4 --writers 2
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import multiprocessing
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from werkzeug.serving import make_server
+
+from app import create_app, bootstrap_database, db, Employee, User, SQLITE_PRAGMAS
+
+BENCH_EMAIL_DOMAIN = 'benchmark.invalid'
+BENCH_EMPLOYEE_USER = 'bench_employee'
+BENCH_PASSWORD = 'bench'
+
+def build_context():
+    """Pick the ids, names and form data the routes need from the current database."""
+    sample = Employee.query.filter(~Employee.email.like(f'%@{BENCH_EMAIL_DOMAIN}')).order_by(Employee.id).limit(50).all()
+    if not sample:
+        sys.exit('The database has no employees; run seed_data.py first.')
+    employee = sample[len(sample) // 2]
+
+    # An employee login linked to a profile, for the employee-facing routes
+    user = User.query.filter_by(username=BENCH_EMPLOYEE_USER).first()
+    if not user:
+        user = User(username=BENCH_EMPLOYEE_USER, is_admin=False, employee_id=sample[0].id)
+        user.set_password(BENCH_PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+
+    form = {
+        'employee_id': employee.employee_id or '', 'first_name': employee.first_name, 'last_name': employee.last_name,
+        'email': employee.email, 'phone': employee.phone, 'department': employee.department,
+        'position': employee.position, 'hire_date': employee.hire_date.isoformat(),
+        'current_address': employee.current_address, 'permanent_address': employee.permanent_address or '',
+        'salary': str(employee.salary or 0), 'notes': employee.notes or '',
+        'education_count': str(len(employee.educations)), 'certification_count': str(len(employee.certifications))
+    }
+    for i, row in enumerate(employee.educations):
+        form.update({f'education_id_{i}': str(row.id), f'institution_{i}': row.institution, f'degree_{i}': row.degree,
+                     f'field_of_study_{i}': row.field_of_study, f'edu_start_date_{i}': row.start_date.isoformat(),
+                     f'edu_end_date_{i}': row.end_date.isoformat() if row.end_date else '',
+                     f'edu_description_{i}': row.description or ''})
+    for i, row in enumerate(employee.certifications):
+        form.update({f'cert_id_{i}': str(row.id), f'cert_name_{i}': row.name,
+                     f'issuing_organization_{i}': row.issuing_organization, f'issue_date_{i}': row.issue_date.isoformat(),
+                     f'expiry_date_{i}': row.expiry_date.isoformat() if row.expiry_date else '',
+                     f'credential_id_{i}': row.credential_id or '', f'credential_url_{i}': row.credential_url or ''})
+
+    return {
+        'id': employee.id,
+        'ids': ','.join(str(row.id) for row in sample[:20]),
+        'department': employee.department,
+        'search': employee.last_name,
+        'position_prefix': employee.position.split()[0][:3].lower(),
+        'edit_form': form,
+        'run': int(time.time())
+    }
+
+def new_employee_form(ctx, i):
+    form = dict(ctx['edit_form'], employee_id=f'BENCH{ctx["run"]}-{i}', email=f'bench.{ctx["run"]}.{i}@{BENCH_EMAIL_DOMAIN}',
+                education_count='0', certification_count='0')
+    return form
+
+def bench_employee_ids():
+    return [row.id for row in Employee.query.filter(Employee.email.like(f'%@{BENCH_EMAIL_DOMAIN}')).all()]
+
+# (name, method, role, path builder, form builder)
+ROUTES = [
+    ('login', 'GET', None, lambda ctx, i: '/login', None),
+    ('login POST', 'POST', None, lambda ctx, i: '/login', lambda ctx, i: {'username': BENCH_EMPLOYEE_USER, 'password': BENCH_PASSWORD}),
+    ('register', 'GET', None, lambda ctx, i: '/register', None),
+    ('register POST', 'POST', None, lambda ctx, i: '/register',
+     lambda ctx, i: {'username': f'bench_{ctx["run"]}_{i}', 'password': 'x', 'confirm_password': 'x'}),
+    ('logout', 'GET', 'admin', lambda ctx, i: '/logout', None),
+    ('index (admin)', 'GET', 'admin', lambda ctx, i: '/', None),
+    ('index (employee)', 'GET', 'employee', lambda ctx, i: '/', None),
+    ('department_employees', 'GET', 'admin', lambda ctx, i: f'/department/{urllib.parse.quote(ctx["department"])}', None),
+    ('department_employees stream', 'GET', 'admin',
+     lambda ctx, i: f'/department/{urllib.parse.quote(ctx["department"])}?stream=1', None),
+    ('all_employees', 'GET', 'admin', lambda ctx, i: '/all-employees', None),
+    ('all_employees sorted', 'GET', 'admin', lambda ctx, i: '/all-employees?sort=name&order=desc', None),
+    ('all_employees stream', 'GET', 'admin', lambda ctx, i: '/all-employees?stream=1', None),
+    ('employee_table_rows', 'GET', 'admin', lambda ctx, i: '/employee-rows?per_page=200&sort=name', None),
+    ('add_department', 'GET', 'admin', lambda ctx, i: '/add-department', None),
+    ('search_employees', 'GET', 'admin', lambda ctx, i: f'/search?query={urllib.parse.quote(ctx["search"])}', None),
+    ('get_positions', 'GET', 'admin', lambda ctx, i: f'/positions?q={ctx["position_prefix"]}', None),
+    ('get_departments', 'GET', 'admin', lambda ctx, i: '/departments?q=', None),
+    ('add_employee', 'GET', 'admin', lambda ctx, i: '/add', None),
+    ('add_employee POST', 'POST', 'admin', lambda ctx, i: '/add', new_employee_form),
+    ('import_employees_upload', 'GET', 'admin', lambda ctx, i: '/import', None),
+    ('export_employees', 'GET', 'admin',
+     lambda ctx, i: f'/export/ndjson?department={urllib.parse.quote(ctx["department"])}&hired_from=2024-01-01', None),
+    ('api_v1_list', 'GET', 'admin',
+     lambda ctx, i: '/api/v1/employees?limit=200&fields=first_name,last_name,email&include=certifications', None),
+    ('api_v1_detail', 'GET', 'admin', lambda ctx, i: f'/api/v1/employees/{ctx["id"]}?include=educations,certifications', None),
+    ('api_analytics', 'GET', 'admin', lambda ctx, i: '/api/analytics', None),
+    ('analytics_dashboard', 'GET', 'admin', lambda ctx, i: '/analytics', None),
+    ('change_feed', 'GET', 'admin', lambda ctx, i: '/changes?since=0&limit=200', None),
+    ('job_list', 'GET', 'admin', lambda ctx, i: '/jobs', None),
+    ('employee_details', 'GET', 'admin', lambda ctx, i: f'/employee/{ctx["id"]}', None),
+    ('api_employees', 'GET', 'admin', lambda ctx, i: f'/api/employees?ids={ctx["ids"]}', None),
+    ('edit_employee', 'GET', 'admin', lambda ctx, i: f'/employee/{ctx["id"]}/edit', None),
+    ('edit_employee POST', 'POST', 'admin', lambda ctx, i: f'/employee/{ctx["id"]}/edit', lambda ctx, i: ctx['edit_form']),
+    ('delete_employee POST', 'POST', 'admin',
+     lambda ctx, i: f'/employee/{ctx["delete_ids"][i % len(ctx["delete_ids"])]}/delete', lambda ctx, i: {}),
+    ('self_onboarding', 'GET', 'employee', lambda ctx, i: '/self-onboarding', None),
+    ('metrics', 'GET', None, lambda ctx, i: '/metrics', None),
+]
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def login_client(client, role):
+    with client.session_transaction() as sess:
+        sess.clear()
+        if role:
+            sess['logged_in'] = True
+            sess['is_admin'] = role == 'admin'
+            sess['username'] = 'admin' if role == 'admin' else BENCH_EMPLOYEE_USER
+
+def run_client_benchmark(app, ctx, iterations, warmup, only):
+    """Time each route through the test client, counting SQL statements per request."""
+    counter = {'queries': 0}
+
+    def count_query(*args):
+        counter['queries'] += 1
+    event.listen(db.engine, 'after_cursor_execute', count_query)
+
+    client = app.test_client()
+    results = {}
+    for name, method, role, path, data in ROUTES:
+        if only and name not in only:
+            continue
+        if name == 'delete_employee POST':
+            ctx['delete_ids'] = bench_employee_ids()
+            if not ctx['delete_ids']:
+                continue
+        latencies, queries = [], []
+        for i in range(warmup + iterations):
+            login_client(client, role)
+            counter['queries'] = 0
+            started = time.perf_counter()
+            response = client.open(path(ctx, i), method=method, data=data(ctx, i) if data else None)
+            response.get_data()  # drain streamed bodies
+            elapsed = time.perf_counter() - started
+            if response.status_code >= 400:
+                sys.exit(f'{name}: HTTP {response.status_code}')
+            if i >= warmup:
+                latencies.append(elapsed)
+                queries.append(counter['queries'])
+
+        # One extra request under tracemalloc for the peak Python allocation
+        login_client(client, role)
+        tracemalloc.start()
+        client.open(path(ctx, warmup + iterations), method=method,
+                    data=data(ctx, warmup + iterations) if data else None).get_data()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {
+            'p50_ms': round(statistics.median(latencies) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'queries': round(statistics.mean(queries), 2),
+            'peak_kb': round(peak / 1024, 1)
+        }
+        print(f'{name:32} p50 {results[name]["p50_ms"]:9.2f} ms  p99 {results[name]["p99_ms"]:9.2f} ms  '
+              f'queries {results[name]["queries"]:7.2f}  peak {results[name]["peak_kb"]:10.1f} KB', flush=True)
+
+    event.remove(db.engine, 'after_cursor_execute', count_query)
+    return results
+
+def run_http_benchmark(app, ctx, iterations, concurrency, only):
+    """Time read-only routes over real HTTP with `concurrency` clients in parallel."""
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    def opener(role):
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        if role:
+            username, password = ('admin', 'admin') if role == 'admin' else (BENCH_EMPLOYEE_USER, BENCH_PASSWORD)
+            opener.open(base + '/login', urllib.parse.urlencode({'username': username, 'password': password}).encode()).read()
+        return opener
+
+    results = {}
+    try:
+        for name, method, role, path, data in ROUTES:
+            if method != 'GET' or name == 'logout' or (only and name not in only):
+                continue
+            openers = [opener(role) for _ in range(concurrency)]
+
+            def worker(n):
+                timings = []
+                for i in range(n, iterations, concurrency):
+                    started = time.perf_counter()
+                    openers[n].open(base + path(ctx, i)).read()
+                    timings.append(time.perf_counter() - started)
+                return timings
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                latencies = [t for timings in pool.map(worker, range(concurrency)) for t in timings]
+            wall = time.perf_counter() - started
+
+            results[name] = {
+                'p50_ms': round(statistics.median(latencies) * 1000, 3),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+                'rps': round(len(latencies) / wall, 1)
+            }
+            print(f'{name:32} p50 {results[name]["p50_ms"]:9.2f} ms  p99 {results[name]["p99_ms"]:9.2f} ms  '
+                  f'{results[name]["rps"]:9.1f} req/s', flush=True)
+    finally:
+        server.shutdown()
+    return results
+
+# Settings compared by --sqlite-contention; 'legacy' is SQLite as configured before the engine profile:
+# rollback journal, no wait on a locked database, no retries and the default engine options (no larger pool)
+SQLITE_PROFILES = {
+    'legacy': {'SQLITE_PRAGMAS': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 0},
+               'SQLITE_BUSY_RETRIES': 0, 'SQLALCHEMY_ENGINE_OPTIONS': {}},
+    'tuned': {},
+}
+
+def contention_worker(database, profile, role, seconds, ctx, barrier, results):
+    """Issue reads (detail and listing pages) or writes (profile edits) until `seconds` have passed."""
+    app = create_app(dict(SQLITE_PROFILES[profile], SQLALCHEMY_DATABASE_URI=database))
+    app.logger.disabled = True  # lock errors are counted, not printed
+    client = app.test_client()
+    login_client(client, 'admin')
+    latencies, errors = [], 0
+
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'writer':
+                response = client.post(f'/employee/{ctx["id"]}/edit', data=dict(ctx['edit_form'], phone=f'555-{i % 10000:04d}'))
+            else:
+                # Streaming a department holds a read transaction open for the whole response
+                response = client.get(f'/employee/{ctx["id"]}' if i % 2 else f'/department/{urllib.parse.quote(ctx["department"])}?stream=1')
+            response.get_data()
+            failed = response.status_code >= 500
+        except Exception:
+            # A lock error in the middle of a streamed response reaches the client instead of a 500
+            failed = True
+        if failed:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - started)
+        i += 1
+    results.put((role, latencies, errors))
+
+def run_sqlite_contention(database, ctx, readers, writers, seconds):
+    """Run reader and writer processes under each SQLite profile and report throughput and errors."""
+    path = make_url(database).database
+    db.session.remove()
+    db.engine.dispose()
+    roles = ['reader'] * readers + ['writer'] * writers
+    spawn = multiprocessing.get_context('spawn')
+    results = {}
+    for profile, config in SQLITE_PROFILES.items():
+        # The journal mode is stored in the database file, so switch it before the workers connect
+        journal_mode = config.get('SQLITE_PRAGMAS', SQLITE_PRAGMAS).get('journal_mode', 'DELETE')
+        conn = sqlite3.connect(path)
+        conn.execute(f'PRAGMA journal_mode={journal_mode}')
+        conn.close()
+
+        queue, barrier = spawn.Queue(), spawn.Barrier(len(roles))
+        processes = [spawn.Process(target=contention_worker, args=(database, profile, role, seconds, ctx, barrier, queue))
+                     for role in roles]
+        for process in processes:
+            process.start()
+        outcomes = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        for role in dict.fromkeys(roles):
+            latencies = [t for r, timings, _ in outcomes if r == role for t in timings]
+            errors = sum(e for r, _, e in outcomes if r == role)
+            name = f'{profile} {role}s'
+            results[name] = {
+                'p50_ms': round(statistics.median(latencies) * 1000, 3) if latencies else None,
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+                'rps': round(len(latencies) / seconds, 1),
+                'errors': errors
+            }
+            print(f'{name:32} p50 {results[name]["p50_ms"] or 0:9.2f} ms  p99 {results[name]["p99_ms"] or 0:9.2f} ms  '
+                  f'{results[name]["rps"]:9.1f} ok/s  {errors:6d} errors', flush=True)
+    return results
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of regressions of `results` against `baseline`."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        # A small absolute allowance keeps sub-millisecond routes from flapping on noise
+        if current['p99_ms'] and previous['p99_ms'] and current['p99_ms'] > previous['p99_ms'] * (1 + tolerance) + 1.0:
+            regressions.append(f'{name}: p99 {previous["p99_ms"]} -> {current["p99_ms"]} ms')
+        if 'queries' in current and current['queries'] > previous.get('queries', current['queries']):
+            regressions.append(f'{name}: queries/request {previous["queries"]} -> {current["queries"]}')
+        if 'peak_kb' in current and current['peak_kb'] > previous.get('peak_kb', current['peak_kb']) * (1 + tolerance) + 64:
+            regressions.append(f'{name}: peak memory {previous["peak_kb"]} -> {current["peak_kb"]} KB')
+        if 'rps' in current and current['rps'] < previous.get('rps', 0) / (1 + tolerance):
+            regressions.append(f'{name}: throughput {previous["rps"]} -> {current["rps"]} req/s')
+        if current.get('errors', 0) > previous.get('errors', 0):
+            regressions.append(f'{name}: errors {previous.get("errors", 0)} -> {current["errors"]}')
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark every route of the employee management app.')
+    parser.add_argument('--database', help='SQLAlchemy database URI (default: the app database)')
+    parser.add_argument('--iterations', type=int, default=50, help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per route (test client mode)')
+    parser.add_argument('--http', action='store_true', help='use a local HTTP server and concurrent clients')
+    parser.add_argument('--concurrency', type=int, default=8, help='parallel clients in --http mode')
+    parser.add_argument('--sqlite-contention', action='store_true',
+                        help='compare concurrent reader/writer processes under the legacy and tuned SQLite settings')
+    parser.add_argument('--readers', type=int, default=4, help='reader processes in --sqlite-contention mode')
+    parser.add_argument('--writers', type=int, default=2, help='writer processes in --sqlite-contention mode')
+    parser.add_argument('--seconds', type=float, default=10, help='duration per profile in --sqlite-contention mode')
+    parser.add_argument('--route', action='append', help='only benchmark this route (repeatable)')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write the results as a baseline JSON file')
+    parser.add_argument('--baseline', metavar='PATH', help='fail if results regress against this baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression (default 0.25)')
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database} if args.database else None)
+    with app.app_context():
+        bootstrap_database()
+        ctx = build_context()
+        if args.sqlite_contention:
+            results = run_sqlite_contention(args.database or app.config['SQLALCHEMY_DATABASE_URI'], ctx,
+                                            args.readers, args.writers, args.seconds)
+        elif args.http:
+            results = run_http_benchmark(app, ctx, args.iterations, args.concurrency, args.route)
+        else:
+            results = run_client_benchmark(app, ctx, args.iterations, args.warmup, args.route)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'Baseline written to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print('Regressions against baseline:')
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print('No regressions against baseline.')
\ No newline at end of file
@@ -1,6 +1,8 @@
-from app import app, db, Employee
+from app import create_app, Employee
+
+app = create_app()
 
 with app.app_context():
     print('Current Employees:')
-    for e in Employee.query.all():
+    for e in Employee.query.order_by(Employee.id).yield_per(500):
         print(f'{e.id}: {e.first_name} {e.last_name} - {e.department} ({e.position}) - Salary: ${e.salary}')
\ No newline at end of file
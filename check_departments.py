@@ -1,10 +1,8 @@
-from app import app, db, Employee
+from app import create_app, get_department_headcounts
+
+app = create_app()
 
 with app.app_context():
-    departments = db.session.query(Employee.department).distinct().all()
-    departments = [dept[0] for dept in departments]
-    
     print('Current Departments:')
-    for dept in departments:
-        count = Employee.query.filter_by(department=dept).count()
+    for dept, count in get_department_headcounts():
         print(f'{dept}: {count} employees')
\ No newline at end of file
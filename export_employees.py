@@ -0,0 +1,25 @@
+import argparse
+import sys
+from datetime import date
+
+from app import create_app, EXPORTERS, EXPORT_FORMATS, filtered_employee_query
+
+parser = argparse.ArgumentParser(description='Stream employees with their education and certification records to a file.')
+parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson', help='output format (default: ndjson)')
+parser.add_argument('--department', help='only export this department')
+parser.add_argument('--hired-from', type=date.fromisoformat, help='earliest hire date (YYYY-MM-DD)')
+parser.add_argument('--hired-to', type=date.fromisoformat, help='latest hire date (YYYY-MM-DD)')
+parser.add_argument('-o', '--output', help='output file (default: standard output)')
+args = parser.parse_args()
+
+app = create_app()
+
+with app.app_context():
+    query = filtered_employee_query(args.department, args.hired_from, args.hired_to)
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in EXPORTERS[args.format](query):
+            out.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+    finally:
+        if args.output:
+            out.close()
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Bounded caches for rendered HTML fragments.
+
+Keys are tuples whose first element is the owning row id, so every fragment of a row can
+be dropped at once when the row is written. A process-local LRU is the default; a SQLite
+file can be used instead to share fragments between worker processes.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class LRUFragmentCache:
+    """Process-local cache holding at most `max_entries` fragments, least recently used evicted first."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.owners = {}
+        self.lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        with self.lock:
+            for key in keys:
+                html = self.entries.get(key)
+                if html is not None:
+                    self.entries.move_to_end(key)
+                    found[key] = html
+        return found
+
+    def set_many(self, fragments):
+        with self.lock:
+            for key, html in fragments.items():
+                self.entries[key] = html
+                self.entries.move_to_end(key)
+                self.owners.setdefault(key[0], set()).add(key)
+            while len(self.entries) > self.max_entries:
+                key, _ = self.entries.popitem(last=False)
+                self._forget_owner(key)
+
+    def invalidate(self, owners):
+        with self.lock:
+            for owner in owners:
+                for key in self.owners.pop(owner, ()):
+                    self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.owners.clear()
+
+    def _forget_owner(self, key):
+        keys = self.owners.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.owners[key[0]]
+
+class SQLiteFragmentCache:
+    """Fragment cache in a SQLite file, shared by every process that opens the same path."""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self.local = threading.local()
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS fragment (key TEXT PRIMARY KEY, owner INTEGER NOT NULL, html TEXT NOT NULL, used_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_fragment_owner ON fragment (owner)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_fragment_used_at ON fragment (used_at)")
+
+    def _connection(self):
+        # One connection per thread; after a fork the parent's connections are not reused
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _key(key):
+        return ':'.join(str(part) for part in key)
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        names = {self._key(key): key for key in keys}
+        conn = self._connection()
+        placeholders = ', '.join('?' * len(names))
+        rows = conn.execute(f"SELECT key, html FROM fragment WHERE key IN ({placeholders})", list(names)).fetchall()
+        if rows:
+            conn.execute(f"UPDATE fragment SET used_at = ? WHERE key IN ({', '.join('?' * len(rows))})",
+                         [time.time()] + [name for name, _ in rows])
+        return {names[name]: html for name, html in rows}
+
+    def set_many(self, fragments):
+        if not fragments:
+            return
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN")
+        conn.executemany("INSERT OR REPLACE INTO fragment (key, owner, html, used_at) VALUES (?, ?, ?, ?)",
+                         [(self._key(key), key[0], html, now) for key, html in fragments.items()])
+        conn.execute("""
+            DELETE FROM fragment WHERE key IN (
+                SELECT key FROM fragment ORDER BY used_at
+                LIMIT MAX((SELECT COUNT(*) FROM fragment) - ?, 0)
+            )
+        """, (self.max_entries,))
+        conn.execute("COMMIT")
+
+    def invalidate(self, owners):
+        owners = list(owners)
+        if owners:
+            self._connection().execute(f"DELETE FROM fragment WHERE owner IN ({', '.join('?' * len(owners))})", owners)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM fragment")
+
+def init_fragment_cache(app):
+    """Attach the fragment cache configured for `app` as app.extensions['fragment_cache'].
+
+    FRAGMENT_CACHE_SIZE (default 20000) bounds the number of cached fragments;
+    FRAGMENT_CACHE_PATH, if set, stores them in that SQLite file so worker processes share them.
+    """
+    max_entries = int(app.config.get('FRAGMENT_CACHE_SIZE', 20000))
+    path = app.config.get('FRAGMENT_CACHE_PATH')
+    cache = SQLiteFragmentCache(path, max_entries) if path else LRUFragmentCache(max_entries)
+    app.extensions['fragment_cache'] = cache
+    return cache
@@ -0,0 +1,27 @@
+"""gunicorn settings used by `flask --app app serve`, or directly:
+
+    gunicorn -c gunicorn.conf.py 'app:create_app()'
+
+Command-line options override these; GUNICORN_PRELOAD=0 (set by `serve --no-preload`)
+loads the app in each worker instead of once in the master. Signals to the master process:
+HUP replaces the workers gracefully (without preloading they also load the new code),
+TERM shuts down gracefully, TTIN/TTOU add or remove a worker.
+"""
+import os
+
+bind = '0.0.0.0:12000'
+# Processes scale across cores; threads overlap the time a request spends waiting on SQLite
+workers = (os.cpu_count() or 1) * 2 + 1
+threads = 4
+worker_class = 'gthread'
+# Import and configure the app once in the master; workers inherit it through fork
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+timeout = 30
+graceful_timeout = 30
+accesslog = '-'
+
+def post_fork(server, worker):
+    from app import reset_after_fork, start_scheduler
+    reset_after_fork()
+    # Each worker schedules the background jobs; a job claims its run, so one worker runs it
+    start_scheduler()
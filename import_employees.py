@@ -0,0 +1,25 @@
+import argparse
+import sys
+
+from app import create_app, import_employees, import_format_for, IMPORT_CHUNK_SIZE, IMPORT_FORMATS
+
+parser = argparse.ArgumentParser(description='Bulk import employees from a CSV or NDJSON file.')
+parser.add_argument('path', help='file to import, or - for standard input')
+parser.add_argument('--format', choices=IMPORT_FORMATS, help='file format (default: detect from extension)')
+parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='rows per transaction')
+args = parser.parse_args()
+
+fmt = args.format or import_format_for(args.path)
+
+app = create_app()
+
+with app.app_context():
+    if args.path == '-':
+        result = import_employees(sys.stdin, fmt, args.chunk_size)
+    else:
+        with open(args.path, encoding='utf-8-sig', newline='') as f:
+            result = import_employees(f, fmt, args.chunk_size)
+    
+    for line_number, message in result['errors']:
+        print(f'line {line_number}: {message}')
+    print(f'Imported {result["imported"]} employees, {len(result["errors"])} errors')
\ No newline at end of file
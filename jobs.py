@@ -0,0 +1,37 @@
+"""Thread pool that runs background jobs outside the request that started them.
+
+The pool only executes; the job records (status, progress, cancellation) live in the
+database, so any worker process can report on a job and a job survives in the table when
+the process that queued it exits (see run_job and recover_background_jobs in app.py).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Jobs mostly wait on SQLite, which admits one writer at a time; more threads would only queue on its lock
+JOB_WORKERS = 2
+
+class JobExecutor:
+    """Runs submitted functions on a pool of `max_workers` threads, created on first use in each process."""
+
+    def __init__(self, max_workers=JOB_WORKERS):
+        self.max_workers = max_workers
+        self.pool = None
+        self.pid = None
+
+    def submit(self, func, *args):
+        # A forked worker inherits the parent's pool object but none of its threads
+        if self.pool is None or self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        return self.pool.submit(func, *args)
+
+    def shutdown(self, wait=True):
+        if self.pool is not None and self.pid == os.getpid():
+            self.pool.shutdown(wait=wait)
+        self.pool = None
+
+def init_jobs(app):
+    """Attach a JobExecutor sized by the JOB_WORKERS setting as app.extensions['jobs']."""
+    executor = JobExecutor(app.config.get('JOB_WORKERS', JOB_WORKERS))
+    app.extensions['jobs'] = executor
+    return executor
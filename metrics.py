@@ -0,0 +1,129 @@
+"""Per-request timing and SQL instrumentation, exposed in Prometheus text format on /metrics."""
+import threading
+import time
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Histogram buckets: request/render/SQL time in seconds, and statements per request
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+class Histogram:
+    """Cumulative Prometheus-style histogram keyed by a single `endpoint` label."""
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, endpoint, value):
+        with self.lock:
+            series = self.series.get(endpoint)
+            if series is None:
+                series = self.series[endpoint] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for endpoint, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series['buckets']):
+                    lines.append(f'{self.name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {series["count"]}')
+                lines.append(f'{self.name}_sum{{endpoint="{endpoint}"}} {series["sum"]}')
+                lines.append(f'{self.name}_count{{endpoint="{endpoint}"}} {series["count"]}')
+        return lines
+
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Wall time spent handling a request.', DURATION_BUCKETS)
+RENDER_DURATION = Histogram('template_render_duration_seconds', 'Time spent rendering templates per request.', DURATION_BUCKETS)
+SQL_DURATION = Histogram('sql_duration_seconds', 'Total time spent executing SQL per request.', DURATION_BUCKETS)
+SQL_QUERIES = Histogram('sql_queries_per_request', 'Number of SQL statements executed per request.', QUERY_COUNT_BUCKETS)
+HISTOGRAMS = [REQUEST_DURATION, RENDER_DURATION, SQL_DURATION, SQL_QUERIES]
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+# SQL statement timing, registered once for every engine
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own execution context: a statement that raises never reaches
+    # after_cursor_execute, so a per-connection stack would pair later timings with its start
+    context._query_start = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    if not has_request_context() or 'sql_count' not in g:
+        return
+    g.sql_count += 1
+    g.sql_time += elapsed
+
+    threshold = g.slow_query_threshold
+    if threshold is not None and elapsed * 1000 >= threshold:
+        g.slow_query_logger.warning('slow query (%.1f ms) in %s: %s', elapsed * 1000, _endpoint(), ' '.join(statement.split()))
+
+# Request and template timing
+
+def _start_request():
+    g.request_start = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+    g.render_time = 0.0
+    g.render_stack = []
+
+def _before_render(sender, template, context, **extra):
+    if 'render_stack' in g:
+        g.render_stack.append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    if g.get('render_stack'):
+        started = g.render_stack.pop()
+        # Only count the outermost template so includes/extends aren't double counted
+        if not g.render_stack:
+            g.render_time += time.perf_counter() - started
+
+def _finish_request(response):
+    if 'request_start' in g:
+        endpoint = _endpoint()
+        REQUEST_DURATION.observe(endpoint, time.perf_counter() - g.request_start)
+        RENDER_DURATION.observe(endpoint, g.render_time)
+        SQL_DURATION.observe(endpoint, g.sql_time)
+        SQL_QUERIES.observe(endpoint, g.sql_count)
+    return response
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+def init_metrics(app):
+    """Instrument `app` and register the /metrics endpoint.
+
+    SLOW_QUERY_THRESHOLD_MS (default None, disabled) logs every statement slower than
+    the threshold together with the view that issued it.
+    """
+    @app.before_request
+    def start_request_metrics():
+        _start_request()
+        threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS')
+        g.slow_query_threshold = float(threshold) if threshold not in (None, '') else None
+        g.slow_query_logger = app.logger
+
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    def metrics():
+        return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
\ No newline at end of file
@@ -1,31 +1,307 @@
 import sqlite3
 import os
+import sys
+from datetime import datetime
 
-# Path to the database file
-db_path = 'instance/employees.db'
-
-# Check if the database file exists
-if not os.path.exists(db_path):
-    print(f"Database file {db_path} not found.")
-    exit(1)
-
-# Connect to the database
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-# Check if employee_id column exists in user table
-cursor.execute("PRAGMA table_info(user)")
-columns = cursor.fetchall()
-column_names = [column[1] for column in columns]
-
-if 'employee_id' not in column_names:
-    print("Adding employee_id column to user table...")
-    cursor.execute("ALTER TABLE user ADD COLUMN employee_id INTEGER")
-    conn.commit()
-    print("Column added successfully.")
-else:
-    print("employee_id column already exists in user table.")
-
-# Close the connection
-conn.close()
-print("Database migration completed.")
\ No newline at end of file
+# Default path to the database file
+DB_PATH = 'instance/employees.db'
+
+# Rows per transaction for data backfills, so writers are never locked out for long
+BATCH_SIZE = 5000
+
+def column_names(conn, table):
+    return [column[1] for column in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+def table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+def run_in_batches(conn, table, sql):
+    """Run `sql` (with ? placeholders for an id range) over `table` one id range per transaction."""
+    max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(sql, (start, start + BATCH_SIZE))
+        conn.execute("COMMIT")
+
+def create_index(name, table, columns):
+    def migrate(conn):
+        # SQLite builds an index in one statement; running each index as its own
+        # migration keeps every write lock limited to a single index build
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+    return migrate
+
+# Migrations
+
+def add_user_employee_id(conn):
+    if 'employee_id' not in column_names(conn, 'user'):
+        conn.execute("ALTER TABLE user ADD COLUMN employee_id INTEGER")
+
+def create_department_catalog(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS department (
+            id INTEGER NOT NULL,
+            name VARCHAR(50) NOT NULL,
+            headcount INTEGER NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (name)
+        )
+    """)
+
+    # The standalone headcount summary has been folded into department.headcount
+    conn.execute("DROP TABLE IF EXISTS department_headcount")
+
+    if 'department_id' not in column_names(conn, 'employee'):
+        conn.execute("ALTER TABLE employee ADD COLUMN department_id INTEGER REFERENCES department (id)")
+
+    # Register every department currently in use, including those that only have a placeholder
+    conn.execute("""
+        INSERT OR IGNORE INTO department (name, headcount, created_at)
+        SELECT DISTINCT department, 0, CURRENT_TIMESTAMP FROM employee WHERE department IS NOT NULL
+    """)
+
+    # Placeholder employees were only ever created to make a department exist; the catalog does that now
+    conn.execute("""
+        DELETE FROM employee
+        WHERE first_name = 'Department' AND last_name = 'Placeholder'
+          AND id NOT IN (SELECT employee_id FROM user WHERE employee_id IS NOT NULL)
+    """)
+
+def link_employee_departments(conn):
+    run_in_batches(conn, 'employee', """
+        UPDATE employee
+        SET department_id = (SELECT id FROM department WHERE department.name = employee.department)
+        WHERE department_id IS NULL AND id >= ? AND id < ?
+    """)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("""
+        UPDATE department
+        SET headcount = (SELECT COUNT(*) FROM employee WHERE employee.department_id = department.id)
+    """)
+    conn.execute("COMMIT")
+
+EMPLOYEE_FTS_COLUMNS = 'first_name, last_name, position, department, email, notes'
+
+def create_employee_search_index(conn):
+    if table_exists(conn, 'employee_fts'):
+        return
+    new_values = ', '.join(f'new.{column.strip()}' for column in EMPLOYEE_FTS_COLUMNS.split(','))
+    old_values = ', '.join(f'old.{column.strip()}' for column in EMPLOYEE_FTS_COLUMNS.split(','))
+    conn.execute(f"CREATE VIRTUAL TABLE employee_fts USING fts5({EMPLOYEE_FTS_COLUMNS}, content='employee', content_rowid='id', tokenize='trigram')")
+    conn.execute(f"""CREATE TRIGGER employee_fts_ai AFTER INSERT ON employee BEGIN
+        INSERT INTO employee_fts(rowid, {EMPLOYEE_FTS_COLUMNS}) VALUES (new.id, {new_values});
+    END""")
+    conn.execute(f"""CREATE TRIGGER employee_fts_ad AFTER DELETE ON employee BEGIN
+        INSERT INTO employee_fts(employee_fts, rowid, {EMPLOYEE_FTS_COLUMNS}) VALUES ('delete', old.id, {old_values});
+    END""")
+    conn.execute(f"""CREATE TRIGGER employee_fts_au AFTER UPDATE OF {EMPLOYEE_FTS_COLUMNS} ON employee BEGIN
+        INSERT INTO employee_fts(employee_fts, rowid, {EMPLOYEE_FTS_COLUMNS}) VALUES ('delete', old.id, {old_values});
+        INSERT INTO employee_fts(rowid, {EMPLOYEE_FTS_COLUMNS}) VALUES (new.id, {new_values});
+    END""")
+    conn.execute("INSERT INTO employee_fts(employee_fts) VALUES ('rebuild')")
+
+def add_employee_row_version(conn):
+    columns = column_names(conn, 'employee')
+    if 'version' not in columns:
+        conn.execute("ALTER TABLE employee ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    if 'updated_at' not in columns:
+        conn.execute("ALTER TABLE employee ADD COLUMN updated_at DATETIME")
+
+def backfill_employee_updated_at(conn):
+    run_in_batches(conn, 'employee', """
+        UPDATE employee
+        SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)
+        WHERE updated_at IS NULL AND id >= ? AND id < ?
+    """)
+
+def create_change_log(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+            entity VARCHAR(20) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            op VARCHAR(10) NOT NULL,
+            changed_at DATETIME NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_change_log_entity ON change_log (entity, entity_id)")
+
+def backfill_change_log(conn):
+    # One insert entry per existing row, so a consumer can sync from scratch with since=0
+    for table, entity in (('department', 'departments'), ('employee', 'employees')):
+        timestamp = 'COALESCE(updated_at, created_at, CURRENT_TIMESTAMP)' if table == 'employee' else 'COALESCE(created_at, CURRENT_TIMESTAMP)'
+        run_in_batches(conn, table, f"""
+            INSERT INTO change_log (entity, entity_id, op, changed_at)
+            SELECT '{entity}', id, 'insert', {timestamp} FROM {table}
+            WHERE id >= ? AND id < ?
+              AND NOT EXISTS (SELECT 1 FROM change_log WHERE entity = '{entity}' AND entity_id = {table}.id)
+            ORDER BY id
+        """)
+
+def create_analytics_rollups(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS department_rollup (
+            department VARCHAR(50) NOT NULL,
+            dimension VARCHAR(20) NOT NULL,
+            bucket VARCHAR(20) NOT NULL,
+            headcount INTEGER NOT NULL,
+            salary_sum FLOAT NOT NULL,
+            PRIMARY KEY (department, dimension, bucket)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS employee_rollup_member (
+            employee_id INTEGER NOT NULL,
+            department VARCHAR(50) NOT NULL,
+            salary FLOAT NOT NULL,
+            salary_bucket INTEGER NOT NULL,
+            hire_month VARCHAR(7) NOT NULL,
+            cert_month VARCHAR(7) NOT NULL,
+            PRIMARY KEY (employee_id)
+        )
+    """)
+
+def backfill_analytics_rollups(conn):
+    # Same cells as employee_rollup_select() in app.py (salary buckets of 1000)
+    run_in_batches(conn, 'employee', """
+        INSERT OR IGNORE INTO employee_rollup_member (employee_id, department, salary, salary_bucket, hire_month, cert_month)
+        SELECT employee.id, employee.department, COALESCE(employee.salary, 0), CAST(COALESCE(employee.salary, 0) / 1000 AS INTEGER),
+               strftime('%Y-%m', employee.hire_date),
+               COALESCE((SELECT strftime('%Y-%m', MAX(COALESCE(expiry_date, '9999-12-31'))) FROM certification
+                         WHERE certification.employee_id = employee.id), 'none')
+        FROM employee
+        WHERE employee.id >= ? AND employee.id < ?
+    """)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM department_rollup")
+    for dimension in ('salary_bucket', 'hire_month', 'cert_month'):
+        conn.execute(f"""
+            INSERT INTO department_rollup (department, dimension, bucket, headcount, salary_sum)
+            SELECT department, '{dimension}', CAST({dimension} AS TEXT), COUNT(*), SUM(salary)
+            FROM employee_rollup_member GROUP BY department, {dimension}
+        """)
+    conn.execute("COMMIT")
+
+def create_certification_alerts(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_job (
+            name VARCHAR(50) NOT NULL,
+            last_run_at DATETIME,
+            state TEXT,
+            PRIMARY KEY (name)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS certification_alert (
+            id INTEGER NOT NULL,
+            certification_id INTEGER NOT NULL,
+            employee_id INTEGER NOT NULL,
+            expiry_date DATE NOT NULL,
+            created_at DATETIME NOT NULL,
+            delivered_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (certification_id, expiry_date)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_certification_alert_pending ON certification_alert (delivered_at, id)")
+
+def create_background_job(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS background_job (
+            id INTEGER NOT NULL,
+            kind VARCHAR(20) NOT NULL,
+            status VARCHAR(10) NOT NULL,
+            params TEXT NOT NULL,
+            progress INTEGER NOT NULL,
+            total INTEGER,
+            result TEXT,
+            error TEXT,
+            cancel_requested BOOLEAN NOT NULL,
+            created_by VARCHAR(80),
+            created_at DATETIME NOT NULL,
+            started_at DATETIME,
+            heartbeat_at DATETIME,
+            finished_at DATETIME,
+            PRIMARY KEY (id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_background_job_status ON background_job (status, id)")
+
+# (version, description, function, transactional). Non-transactional migrations
+# manage their own (batched) transactions and must be safe to re-run.
+MIGRATIONS = [
+    ('0001', 'add user.employee_id', add_user_employee_id, True),
+    ('0002', 'create department catalog', create_department_catalog, True),
+    ('0003', 'link employees to departments', link_employee_departments, False),
+    ('0004', 'create employee full-text search index', create_employee_search_index, True),
+    ('0005', 'index employee.department', create_index('ix_employee_department', 'employee', 'department'), True),
+    ('0006', 'index employee.position', create_index('ix_employee_position', 'employee', 'position'), True),
+    ('0007', 'index employee.last_name', create_index('ix_employee_last_name', 'employee', 'last_name'), True),
+    ('0008', 'index employee.hire_date', create_index('ix_employee_hire_date', 'employee', 'hire_date'), True),
+    ('0009', 'index education.employee_id', create_index('ix_education_employee_id', 'education', 'employee_id'), True),
+    ('0010', 'index certification.employee_id', create_index('ix_certification_employee_id', 'certification', 'employee_id'), True),
+    ('0011', 'index certification.expiry_date', create_index('ix_certification_expiry_date', 'certification', 'expiry_date'), True),
+    ('0012', 'add employee.version and employee.updated_at', add_employee_row_version, True),
+    ('0013', 'backfill employee.updated_at', backfill_employee_updated_at, False),
+    ('0014', 'index employee.updated_at', create_index('ix_employee_updated_at', 'employee', 'updated_at'), True),
+    ('0015', 'index employee (department, updated_at)',
+     create_index('ix_employee_department_updated_at', 'employee', 'department, updated_at'), True),
+    ('0016', 'index employee (department, position, hire_date, salary)',
+     create_index('ix_employee_search_facets', 'employee', 'department, position, hire_date, salary'), True),
+    ('0017', 'index certification (employee_id, expiry_date)',
+     create_index('ix_certification_employee_expiry', 'certification', 'employee_id, expiry_date'), True),
+    ('0018', 'create change_log', create_change_log, True),
+    ('0019', 'backfill change_log with existing rows', backfill_change_log, False),
+    ('0020', 'create analytics rollup tables', create_analytics_rollups, True),
+    ('0021', 'backfill analytics rollups', backfill_analytics_rollups, False),
+    ('0022', 'create scheduled_job and certification_alert', create_certification_alerts, True),
+    ('0023', 'create background_job', create_background_job, True),
+]
+
+def run_migrations(db_path, verbose=False):
+    """Apply every migration not yet recorded in schema_migration; return the versions applied."""
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_migration (version VARCHAR(20) PRIMARY KEY, description VARCHAR(200), applied_at DATETIME)")
+        applied = []
+        for version, description, migrate, transactional in MIGRATIONS:
+            if conn.execute("SELECT 1 FROM schema_migration WHERE version = ?", (version,)).fetchone():
+                continue
+            if verbose:
+                print(f"Applying {version}: {description}...")
+
+            if transactional:
+                conn.execute("BEGIN IMMEDIATE")
+                # Another process may have applied it while we waited for the lock
+                if conn.execute("SELECT 1 FROM schema_migration WHERE version = ?", (version,)).fetchone():
+                    conn.execute("ROLLBACK")
+                    continue
+                try:
+                    migrate(conn)
+                    conn.execute("INSERT INTO schema_migration (version, description, applied_at) VALUES (?, ?, ?)",
+                                 (version, description, datetime.utcnow()))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            else:
+                migrate(conn)
+                conn.execute("INSERT OR IGNORE INTO schema_migration (version, description, applied_at) VALUES (?, ?, ?)",
+                             (version, description, datetime.utcnow()))
+            applied.append(version)
+        return applied
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+
+    # Check if the database file exists
+    if not os.path.exists(db_path):
+        print(f"Database file {db_path} not found.")
+        exit(1)
+
+    applied = run_migrations(db_path, verbose=True)
+    if not applied:
+        print("Database schema is already up to date.")
+    print("Database migration completed.")
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""In-process scheduler for periodic maintenance jobs.
+
+Jobs run one after another on a single daemon thread. Every serving process may run its own
+scheduler; a job that must run once per interval across processes claims its run in the
+database first (see claim_job_run in app.py).
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class Scheduler:
+    """Runs each registered function every `interval` seconds until stopped."""
+
+    def __init__(self):
+        self.jobs = []
+        self.stopped = threading.Event()
+        self.thread = None
+        self.pid = None
+
+    def add_job(self, name, interval, func):
+        self.jobs.append({'name': name, 'interval': interval, 'func': func, 'next_run': 0.0})
+
+    def run_pending(self):
+        for job in self.jobs:
+            now = time.monotonic()
+            if job['next_run'] <= now:
+                job['next_run'] = now + job['interval']
+                try:
+                    job['func']()
+                except Exception:
+                    # A failing job is retried at its next interval; it never stops the others
+                    logger.exception('Scheduled job %s failed', job['name'])
+
+    def start(self):
+        # A forked child inherits the parent's thread object but not the thread itself
+        if self.thread is not None and self.thread.is_alive() and self.pid == os.getpid():
+            return
+        self.stopped.clear()
+        self.pid = os.getpid()
+        self.thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.run_pending()
+            next_run = min((job['next_run'] for job in self.jobs), default=time.monotonic() + 60)
+            self.stopped.wait(max(next_run - time.monotonic(), 0.1))
+
+def init_scheduler(app):
+    """Attach a Scheduler, not yet started, as app.extensions['scheduler']."""
+    scheduler = Scheduler()
+    app.extensions['scheduler'] = scheduler
+    return scheduler
@@ -0,0 +1,88 @@
+import argparse
+import random
+from datetime import date, timedelta
+
+from app import create_app, bootstrap_database, import_employee_records, IMPORT_CHUNK_SIZE
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'Arjun', 'Priya', 'Kamal', 'Lakshmi', 'Wei', 'Mei', 'Carlos', 'Sofia', 'Ahmed', 'Fatima']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Kumar', 'Sharma',
+              'Chen', 'Wang', 'Nguyen', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Khan', 'Ali', 'Singh']
+DEPARTMENT_NAMES = ['Human Resources', 'Information Technology', 'Finance', 'Marketing', 'Operations', 'Sales',
+                    'Research & Development', 'Customer Support', 'Legal', 'Procurement', 'Facilities', 'Security']
+POSITION_LEVELS = ['Junior', 'Associate', 'Senior', 'Lead', 'Principal']
+POSITION_ROLES = ['Engineer', 'Analyst', 'Manager', 'Specialist', 'Consultant', 'Coordinator', 'Administrator', 'Designer']
+INSTITUTIONS = ['Stanford University', 'Chennai University', 'MIT', 'University of Technology', 'Harvard University',
+                'IIT Madras', 'University of Toronto', 'ETH Zurich']
+DEGREES = ['BSc', 'BA', 'BEng', 'MSc', 'MBA', 'PhD']
+FIELDS = ['Computer Science', 'Economics', 'Accounting', 'Psychology', 'Marketing', 'Mechanical Engineering', 'Law']
+CERTIFICATIONS = [('AWS Certified Solutions Architect', 'Amazon Web Services'), ('PMP', 'Project Management Institute'),
+                  ('CPA', 'AICPA'), ('SHRM-CP', 'SHRM'), ('CISSP', 'ISC2'), ('Scrum Master', 'Scrum Alliance')]
+
+def department_names(count):
+    names = DEPARTMENT_NAMES[:count]
+    names += [f'Department {i}' for i in range(len(names) + 1, count + 1)]
+    return names
+
+def generate_records(employees, departments, rng):
+    """Yield (line_number, record) pairs in the bulk import format."""
+    names = department_names(departments)
+    # Skewed department sizes, like a real org chart
+    weights = [1 / (i + 1) for i in range(len(names))]
+    today = date.today()
+    for i in range(employees):
+        hire_date = today - timedelta(days=rng.randint(0, 365 * 20))
+        educations = []
+        for _ in range(rng.choices([0, 1, 2, 3], weights=[10, 50, 30, 10])[0]):
+            start = hire_date - timedelta(days=rng.randint(365 * 3, 365 * 12))
+            educations.append({
+                'institution': rng.choice(INSTITUTIONS),
+                'degree': rng.choice(DEGREES),
+                'field_of_study': rng.choice(FIELDS),
+                'start_date': start.isoformat(),
+                'end_date': (start + timedelta(days=365 * rng.randint(1, 5))).isoformat()
+            })
+        certifications = []
+        for _ in range(rng.choices([0, 1, 2, 4], weights=[45, 35, 15, 5])[0]):
+            name, organization = rng.choice(CERTIFICATIONS)
+            issued = hire_date + timedelta(days=rng.randint(0, 365 * 5))
+            certifications.append({
+                'name': name,
+                'issuing_organization': organization,
+                'issue_date': issued.isoformat(),
+                'expiry_date': (issued + timedelta(days=365 * rng.randint(1, 4))).isoformat() if rng.random() < 0.8 else None,
+                'credential_id': f'CR-{i}-{len(certifications)}'
+            })
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield i + 1, {
+            'employee_id': f'EMP{i + 1:07d}',
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': f'{first_name.lower()}.{last_name.lower()}.{i + 1}@example.com',
+            'phone': f'555-{rng.randint(0, 9999):04d}',
+            'department': rng.choices(names, weights=weights)[0],
+            'position': f'{rng.choice(POSITION_LEVELS)} {rng.choice(POSITION_ROLES)}',
+            'hire_date': hire_date.isoformat(),
+            'current_address': f'{rng.randint(1, 9999)} Main Street',
+            'salary': round(rng.lognormvariate(11, 0.4), 2),
+            'notes': 'Generated by seed_data.py' if rng.random() < 0.3 else '',
+            'educations': educations,
+            'certifications': certifications
+        }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fill the database with synthetic employees for load testing.')
+    parser.add_argument('--employees', type=int, default=10000, help='number of employees to generate')
+    parser.add_argument('--departments', type=int, default=12, help='number of departments')
+    parser.add_argument('--seed', type=int, default=42, help='random seed, for reproducible data sets')
+    parser.add_argument('--database', help='SQLAlchemy database URI (default: the app database)')
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='rows per transaction')
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database} if args.database else None)
+    with app.app_context():
+        bootstrap_database()
+        result = import_employee_records(generate_records(args.employees, args.departments, random.Random(args.seed)), args.chunk_size)
+        for line_number, message in result['errors'][:20]:
+            print(f'record {line_number}: {message}')
+        print(f'Generated {result["imported"]} employees, {len(result["errors"])} errors')
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""The write paths keep several derived tables in step with the employee rows: department
+headcounts, employee versions, the full-text index, the change log and the analytics rollups.
+Each test runs one write path and checks every derived table against a recount."""
+from collections import Counter
+
+import pytest
+
+from app import (ROLLUP_DIMENSIONS, Certification, Employee, bootstrap_database, create_app, db,
+                 employee_rollup_select, import_employee_records)
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path_factory.mktemp("db") / "employees.db"}',
+                      'TESTING': True})
+    with app.app_context():
+        bootstrap_database()
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update(logged_in=True, is_admin=True, username='admin')
+    return client
+
+def employee_form(email, department='Finance', salary=50000, hire_date='2021-03-15', expiry_date='2026-06-30', employee=None):
+    """Fields of the add/edit form for an employee with one education and one certification."""
+    form = {
+        'employee_id': email.split('@')[0].upper(), 'first_name': 'Ada', 'last_name': 'Lovelace', 'email': email, 'phone': '555-0100',
+        'department': department, 'position': 'Analyst', 'hire_date': hire_date, 'current_address': '1 Main St',
+        'permanent_address': '', 'salary': str(salary), 'notes': '',
+        'education_count': '1', 'institution_0': 'State University', 'degree_0': 'BSc', 'field_of_study_0': 'Mathematics',
+        'edu_start_date_0': '2010-09-01', 'edu_end_date_0': '2014-06-30', 'edu_description_0': '',
+        'certification_count': '1', 'cert_name_0': 'Data Analyst', 'issuing_organization_0': 'Institute',
+        'issue_date_0': '2020-01-10', 'expiry_date_0': expiry_date, 'credential_id_0': '', 'credential_url_0': '',
+    }
+    if employee is not None:
+        form['education_id_0'] = str(employee.educations[0].id)
+        form['cert_id_0'] = str(employee.certifications[0].id)
+    return form
+
+def add_employee(client, email, **fields):
+    response = client.post('/add', data=employee_form(email, **fields))
+    assert response.status_code == 302
+    return Employee.query.filter_by(email=email).one()
+
+def edit_employee(client, employee, **fields):
+    response = client.post(f'/employee/{employee.id}/edit', data=employee_form(employee.email, employee=employee, **fields))
+    assert response.status_code == 302
+    db.session.expire_all()
+    return db.session.get(Employee, employee.id)
+
+def rows(sql):
+    return db.session.execute(db.text(sql)).all()
+
+def assert_derived_tables_match():
+    """Recount every derived table from the employee rows and compare."""
+    db.session.expire_all()
+
+    # Department headcounts and the department_id links
+    assert rows('SELECT name FROM department d WHERE headcount != (SELECT count(*) FROM employee WHERE department_id = d.id)') == []
+    assert rows('SELECT e.id FROM employee e LEFT JOIN department d ON d.id = e.department_id WHERE d.name IS NOT e.department') == []
+
+    # Full-text index against its external content table; raises if they differ
+    db.session.execute(db.text("INSERT INTO employee_fts(employee_fts, rank) VALUES ('integrity-check', 1)"))
+
+    # The newest change log entry of every live row is an insert or update, of every removed row a delete
+    for entity, table in (('employees', 'employee'), ('departments', 'department')):
+        latest = dict(rows(f"SELECT entity_id, op FROM change_log WHERE seq IN "
+                           f"(SELECT max(seq) FROM change_log WHERE entity = '{entity}' GROUP BY entity_id)"))
+        live = {id for (id,) in rows(f'SELECT id FROM {table}')}
+        assert {id: latest.get(id) for id in live if latest.get(id) in (None, 'delete')} == {}
+        assert {id: op for id, op in latest.items() if id not in live and op != 'delete'} == {}
+        # A consumer replaying the feed must see every row inserted before it is updated
+        first = dict(rows(f"SELECT entity_id, op FROM change_log WHERE seq IN "
+                          f"(SELECT min(seq) FROM change_log WHERE entity = '{entity}' GROUP BY entity_id)"))
+        assert {id: op for id, op in first.items() if op != 'insert'} == {}
+
+    # Rollup members and cells
+    employee_ids = [id for (id,) in rows('SELECT id FROM employee')]
+    expected_members = {row.employee_id: tuple(row) for row in db.session.execute(employee_rollup_select(employee_ids))}
+    assert {row.employee_id: tuple(row) for row in rows('SELECT * FROM employee_rollup_member')} == expected_members
+    headcounts, salary_sums = Counter(), Counter()
+    for member in db.session.execute(employee_rollup_select(employee_ids)):
+        for dimension in ROLLUP_DIMENSIONS:
+            key = (member.department, dimension, str(getattr(member, dimension)))
+            headcounts[key] += 1
+            salary_sums[key] += member.salary
+    cells = rows('SELECT department, dimension, bucket, headcount, salary_sum FROM department_rollup')
+    assert {(d, dim, b): h for d, dim, b, h, _ in cells if h} == dict(headcounts)
+    assert {(d, dim, b): s for d, dim, b, _, s in cells if s} == pytest.approx(dict(salary_sums))
+    db.session.rollback()
+
+def test_add_employee(client):
+    employee = add_employee(client, 'add@example.com', department='Research')
+    assert employee.department_id is not None
+    assert rows("SELECT rowid FROM employee_fts WHERE employee_fts MATCH 'Lovelace'") != []
+    assert_derived_tables_match()
+
+def test_edit_employee_moves_department_and_salary(client):
+    employee = add_employee(client, 'edit@example.com', department='Finance', salary=40000)
+    version = employee.version
+    employee = edit_employee(client, employee, department='Marketing', salary=65000, hire_date='2022-07-01')
+    assert employee.version > version
+    assert_derived_tables_match()
+
+def test_edit_salary_within_bucket(client):
+    employee = add_employee(client, 'bucket@example.com', salary=50100)
+    edit_employee(client, employee, salary=50200)
+    assert_derived_tables_match()
+
+def test_certification_edit_advances_version(client):
+    employee = add_employee(client, 'cert@example.com')
+    version = employee.version
+    employee = edit_employee(client, employee, expiry_date='2027-01-31')
+    assert employee.version > version
+    assert_derived_tables_match()
+
+def test_delete_employee(client):
+    employee = add_employee(client, 'delete@example.com', department='Operations')
+    assert client.post(f'/employee/{employee.id}/delete').status_code == 302
+    assert db.session.get(Employee, employee.id) is None
+    assert Certification.query.filter_by(employee_id=employee.id).count() == 0
+    assert_derived_tables_match()
+
+def department_feed(name):
+    return [op for (op,) in rows(f"SELECT op FROM change_log WHERE entity = 'departments' AND entity_id = "
+                                 f"(SELECT id FROM department WHERE name = '{name}') ORDER BY seq")]
+
+def test_new_department_is_inserted_before_updated(client):
+    add_employee(client, 'feed1@example.com', department='Facilities')
+    assert department_feed('Facilities') == ['insert']
+    add_employee(client, 'feed2@example.com', department='Facilities')
+    assert department_feed('Facilities') == ['insert', 'update']
+    assert_derived_tables_match()
+
+def test_bulk_import(app):
+    record = {'first_name': 'Grace', 'last_name': 'Hopper', 'phone': '555-0101', 'position': 'Engineer',
+              'hire_date': '2019-11-04', 'current_address': '2 Harbour Rd', 'salary': 72000,
+              'certifications': [{'name': 'Compilers', 'issuing_organization': 'Navy', 'issue_date': '2018-01-01'}]}
+    records = [
+        (1, dict(record, email='import1@example.com', department='Finance')),
+        (2, dict(record, email='import2@example.com', department='Legal')),  # department created by the import
+        (3, dict(record, email='import1@example.com', department='Finance')),  # duplicate, rejected
+    ]
+    result = import_employee_records(records, chunk_size=2)
+    assert result['imported'] == 2
+    assert [line for line, _ in result['errors']] == [3]
+    assert rows("SELECT headcount FROM department WHERE name = 'Legal'") == [(1,)]
+    assert department_feed('Legal') == ['insert']
+    assert_derived_tables_match()
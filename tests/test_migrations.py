@@ -0,0 +1,53 @@
+"""Migrations bring a database created by the original application up to the current schema."""
+import sqlite3
+
+from migrate_db import MIGRATIONS, run_migrations
+
+# Schema of the original application, before any migration
+LEGACY_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL, username VARCHAR(50) NOT NULL, password_hash VARCHAR(128) NOT NULL,
+    is_admin BOOLEAN, created_at DATETIME, PRIMARY KEY (id), UNIQUE (username)
+);
+CREATE TABLE employee (
+    id INTEGER NOT NULL, employee_id VARCHAR(50), first_name VARCHAR(50) NOT NULL, last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) NOT NULL, phone VARCHAR(20) NOT NULL, department VARCHAR(50) NOT NULL,
+    position VARCHAR(50) NOT NULL, hire_date DATE NOT NULL, current_address VARCHAR(200) NOT NULL,
+    permanent_address VARCHAR(200), salary FLOAT, notes TEXT, created_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (employee_id), UNIQUE (email)
+);
+CREATE TABLE education (
+    id INTEGER NOT NULL, employee_id INTEGER NOT NULL, institution VARCHAR(100) NOT NULL, degree VARCHAR(100) NOT NULL,
+    field_of_study VARCHAR(100) NOT NULL, start_date DATE NOT NULL, end_date DATE, description TEXT, created_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(employee_id) REFERENCES employee (id)
+);
+CREATE TABLE certification (
+    id INTEGER NOT NULL, employee_id INTEGER NOT NULL, name VARCHAR(100) NOT NULL,
+    issuing_organization VARCHAR(100) NOT NULL, issue_date DATE NOT NULL, expiry_date DATE,
+    credential_id VARCHAR(100), credential_url VARCHAR(200), created_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(employee_id) REFERENCES employee (id)
+);
+"""
+
+def legacy_employee(department, first_name='Ada', last_name='Lovelace', email='ada@example.com'):
+    return (first_name, last_name, email, '555-0100', department, 'Analyst', '2021-03-15', '1 Main St', 50000)
+
+def test_placeholder_only_department_survives(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany("""INSERT INTO employee (first_name, last_name, email, phone, department, position, hire_date,
+                        current_address, salary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", [
+        legacy_employee('Finance'),
+        # What /add-department created for a department without employees
+        legacy_employee('Legal', 'Department', 'Placeholder', 'legal@example.com'),
+    ])
+    conn.commit()
+    conn.close()
+
+    assert run_migrations(path) == [version for version, _, _, _ in MIGRATIONS]
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT name, headcount FROM department ORDER BY name').fetchall() == [('Finance', 1), ('Legal', 0)]
+    assert conn.execute('SELECT department FROM employee').fetchall() == [('Finance',)]
+    conn.close()